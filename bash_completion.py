@@ -0,0 +1,914 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tk-unabhängige Indizes für die Autovervollständigung von Bash-Scripts
+"""
+
+import bisect
+import json
+import os
+import queue
+import re
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+
+
+def _prefix_end(prefix):
+    """Kleinste Zeichenkette, die größer ist als alle mit prefix beginnenden"""
+    last = ord(prefix[-1])
+    if last == 0x10FFFF:
+        return None
+    return prefix[:-1] + chr(last + 1)
+
+
+class PrefixIndex:
+    """Sortierte Wortliste für die Präfixsuche per Binärsuche
+
+    Präfixabfragen liefern bereits sortierte Ergebnisse in O(log n + k).
+    """
+
+    def __init__(self, words=()):
+        self.words = []
+        self._word_set = set()
+        self.update(words)
+
+    def __len__(self):
+        return len(self.words)
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def __contains__(self, word):
+        return word in self._word_set
+
+    def update(self, words):
+        """Fügt mehrere Wörter auf einmal hinzu"""
+        new_words = set(words) - self._word_set
+        if not new_words:
+            return
+        self._word_set |= new_words
+        self.words.extend(new_words)
+        self.words.sort()
+
+    def add(self, word):
+        """Fügt ein einzelnes Wort hinzu"""
+        if word in self._word_set:
+            return
+        self._word_set.add(word)
+        bisect.insort(self.words, word)
+
+    def discard(self, word):
+        """Entfernt ein Wort, falls vorhanden"""
+        if word not in self._word_set:
+            return
+        self._word_set.remove(word)
+        del self.words[bisect.bisect_left(self.words, word)]
+
+    def prefix(self, prefix):
+        """Liefert alle Wörter mit dem Anfang prefix, sortiert"""
+        words = self.words
+        if not prefix:
+            return list(words)
+        low = bisect.bisect_left(words, prefix)
+        end = _prefix_end(prefix)
+        high = len(words) if end is None else bisect.bisect_left(words, end, low)
+        return words[low:high]
+
+
+# Zeichen, nach denen ein Treffer als Wortanfang zählt
+WORD_SEPARATORS = "-_./ "
+
+
+def fuzzy_score(pattern, candidate):
+    """Bewertet, wie gut pattern als Teilfolge in candidate vorkommt (fzf-artig)
+
+    Gibt None zurück, wenn die Zeichen von pattern nicht in dieser
+    Reihenfolge in candidate vorkommen. Treffer am Wortanfang und
+    aufeinanderfolgende Treffer zählen mehr, Lücken kosten Punkte.
+    """
+    pattern = pattern.lower()
+    lower = candidate.lower()
+    if not pattern:
+        return 0
+
+    # Vorwärts bis zum Ende des ersten vollständigen Treffers ...
+    pattern_index = 0
+    for index, char in enumerate(lower):
+        if char == pattern[pattern_index]:
+            pattern_index += 1
+            if pattern_index == len(pattern):
+                end = index + 1
+                break
+    else:
+        return None
+
+    # ... und rückwärts zum kürzesten Fenster, das ihn enthält
+    pattern_index = len(pattern) - 1
+    for index in range(end - 1, -1, -1):
+        if lower[index] == pattern[pattern_index]:
+            pattern_index -= 1
+            if pattern_index < 0:
+                start = index
+                break
+
+    score = 0
+    pattern_index = 0
+    consecutive = 0
+    in_gap = False
+    for index in range(start, end):
+        if pattern_index < len(pattern) and lower[index] == pattern[pattern_index]:
+            score += 16
+            if index == 0 or candidate[index - 1] in WORD_SEPARATORS:
+                score += 8
+            if consecutive:
+                score += 4 * consecutive
+            consecutive += 1
+            pattern_index += 1
+            in_gap = False
+        else:
+            score -= 1 if in_gap else 3
+            consecutive = 0
+            in_gap = True
+    return score
+
+
+def edit_distance(first, second, limit):
+    """Editierdistanz mit Vertauschung benachbarter Zeichen (OSA)
+
+    Bricht ab, sobald die Distanz limit sicher überschreitet, und gibt dann
+    limit + 1 zurück.
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    previous_row = None
+    row = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        before_row, previous_row = previous_row, row
+        row = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = 0 if first[i - 1] == second[j - 1] else 1
+            value = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if (
+                before_row is not None
+                and j > 1
+                and first[i - 1] == second[j - 2]
+                and first[i - 2] == second[j - 1]
+            ):
+                value = min(value, before_row[j - 2] + 1)
+            row[j] = value
+        if min(row) > limit:
+            return limit + 1
+    return row[-1]
+
+
+class FuzzyIndex:
+    """Trigramm-Index für die unscharfe Suche in Vervollständigungen
+
+    Vorausgewählt werden Kandidaten über die Zeichen (für Teilfolgen) bzw.
+    über gemeinsame Trigramme (für Tippfehler), bewertet wird nur diese
+    Auswahl. Ein Tippfehler-Treffer zählt wie ein exakter Präfix-Treffer,
+    abzüglich typo_penalty je Fehler; sortiert wird nach Bewertung.
+    """
+
+    # Höchstens so viele Tippfehler-Kandidaten werden genau bewertet
+    typo_candidates = 64
+    typo_penalty = 24
+
+    def __init__(self, words=()):
+        self.words = []  # Kandidat je Nummer, None = entfernt
+        self._ids = {}
+        self._chars = {}
+        self._trigrams = {}
+        self.update(words)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, word):
+        return word in self._ids
+
+    @staticmethod
+    def trigrams(word):
+        """Liefert die Trigramme des Wortes, am Anfang und Ende aufgefüllt"""
+        padded = f"  {word.lower()} "
+        return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+    def update(self, words):
+        """Fügt mehrere Wörter hinzu"""
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        """Fügt ein Wort hinzu"""
+        if word in self._ids:
+            return
+        word_id = len(self.words)
+        self.words.append(word)
+        self._ids[word] = word_id
+        for char in set(word.lower()):
+            self._chars.setdefault(char, set()).add(word_id)
+        for trigram in self.trigrams(word):
+            self._trigrams.setdefault(trigram, set()).add(word_id)
+
+    def discard(self, word):
+        """Entfernt ein Wort, falls vorhanden"""
+        word_id = self._ids.pop(word, None)
+        if word_id is None:
+            return
+        self.words[word_id] = None
+        for char in set(word.lower()):
+            self._chars[char].discard(word_id)
+        for trigram in self.trigrams(word):
+            self._trigrams[trigram].discard(word_id)
+
+    def search(self, pattern, limit=None):
+        """Liefert passende Wörter, die besten zuerst"""
+        if not pattern:
+            return []
+        words = self.words
+
+        # Teilfolgen: nur Kandidaten, die alle Zeichen des Musters enthalten
+        postings = sorted(
+            (self._chars.get(char, ()) for char in set(pattern.lower())), key=len
+        )
+        candidates = set(postings[0]).intersection(*postings[1:])
+        # Schnelle Vorprüfung auf Teilfolge in C, bewertet werden nur Treffer
+        subsequence = re.compile(
+            ".*?".join(map(re.escape, pattern.lower())), re.IGNORECASE | re.DOTALL
+        ).search
+        ranked = []
+        for word_id in candidates:
+            word = words[word_id]
+            if subsequence(word):
+                ranked.append((-fuzzy_score(pattern, word), len(word), word))
+        matched = {word for _, _, word in ranked}
+
+        # Tippfehler: Kandidaten mit den meisten gemeinsamen Trigrammen
+        if len(pattern) >= 3:
+            shared = {}
+            for trigram in self.trigrams(pattern):
+                for word_id in self._trigrams.get(trigram, ()):
+                    shared[word_id] = shared.get(word_id, 0) + 1
+            lower = pattern.lower()
+            exact_score = fuzzy_score(lower, lower)
+            max_distance = max(1, len(pattern) // 4)
+            # Nur Wörter passender Länge können nah genug sein
+            best = sorted(
+                (
+                    word_id
+                    for word_id in shared
+                    if abs(len(words[word_id]) - len(pattern)) <= max_distance
+                ),
+                key=shared.get,
+                reverse=True,
+            )
+            for word_id in best[: self.typo_candidates]:
+                word = words[word_id]
+                if word in matched:
+                    continue
+                distance = edit_distance(lower, word.lower(), max_distance)
+                if distance <= max_distance:
+                    score = exact_score - self.typo_penalty * distance
+                    ranked.append((-score, len(word), word))
+
+        ranked.sort()
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [word for _, _, word in ranked]
+
+
+# Kommentar bis zum Zeilenende; "#" zählt nur am Wortanfang (nicht in $# oder ${#x})
+_COMMENT = re.compile(r"(?:^|(?<=\s))#.*")
+# NAME=, NAME+=, NAME[i]= am Anfang eines Wortes, auch nach local/export/(( usw.
+_ASSIGNMENT = re.compile(
+    r"(?:^|(?<=[\s;&|(]))([A-Za-z_][A-Za-z0-9_]*)(?:\[[^\]]*\])?\+?="
+)
+# Deklarationen und read mit ihren Argumenten bis zum Ende des Befehls
+_DECLARATION = re.compile(
+    r"(?:^|(?<=[\s;&|(]))(local|declare|typeset|export|readonly|read)\b([^;&|]*)"
+)
+_LOOP_VARIABLE = re.compile(
+    r"(?:^|(?<=[\s;&|(]))(?:for|select)\s+([A-Za-z_][A-Za-z0-9_]*)\b"
+)
+_FUNCTION = re.compile(
+    r"^\s*(?:function\s+([A-Za-z_][\w:.-]*)(?:\s*\(\s*\))?"
+    r"|([A-Za-z_][\w:.-]*)\s*\(\s*\))"
+)
+_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# Optionen von read, die ein Argument erwarten (-a liefert einen Namen)
+_READ_OPTIONS_WITH_ARGUMENT = {"-d", "-i", "-n", "-N", "-p", "-t", "-u"}
+# "source DATEI" bzw. ". DATEI" am Anfang eines Befehls
+_SOURCE = re.compile(r"(?:^|[;&|({]|\b(?:then|do|else))\s*(?:source|\.)\s+([^;&|]+)")
+# Ausdrücke für das Verzeichnis des Scripts selbst, z.B. $(dirname "$0")/
+_SCRIPT_DIR = re.compile(
+    r"^(?:\$\(\s*dirname\s+\$\{?(?:0|BASH_SOURCE(?:\[0\])?)\}?\s*\)"
+    r"|\$\{(?:0|BASH_SOURCE(?:\[0\])?)%/\*\})/"
+)
+
+
+def line_symbols(line):
+    """Liefert die in einer Zeile definierten (Variablen, Funktionen)
+
+    Erkannt werden Zuweisungen, local/declare/typeset/export/readonly,
+    read, for/select-Schleifenvariablen sowie "name()" und
+    "function name". Mehrzeilige Konstrukte werden nicht berücksichtigt.
+    """
+    line = _COMMENT.sub("", line)
+    variables = [match.group(1) for match in _ASSIGNMENT.finditer(line)]
+    variables.extend(match.group(1) for match in _LOOP_VARIABLE.finditer(line))
+
+    for match in _DECLARATION.finditer(line):
+        keyword, arguments = match.groups()
+        try:
+            words = shlex.split(arguments)
+        except ValueError:
+            words = arguments.split()
+        skip_next = False
+        for word in words:
+            if skip_next:
+                skip_next = False
+            elif word.startswith("-"):
+                skip_next = keyword == "read" and word in _READ_OPTIONS_WITH_ARGUMENT
+            else:
+                name = _NAME.match(word)
+                if name is not None and name.end() in (len(word), word.find("=")):
+                    variables.append(name.group())
+
+    functions = []
+    match = _FUNCTION.match(line)
+    if match is not None:
+        functions.append(match.group(1) or match.group(2))
+    return tuple(dict.fromkeys(variables)), tuple(functions)
+
+
+def line_sources(line):
+    """Liefert die Dateien, die eine Zeile per source bzw. . einbindet
+
+    Ein führendes $(dirname "$0")/ oder ${BASH_SOURCE%/*}/ wird entfernt, das
+    Ziel gilt dann relativ zum Script. Ziele mit anderen Variablen oder
+    Befehlsersetzungen lassen sich nicht auflösen und werden übergangen.
+    """
+    sources = []
+    for match in _SOURCE.finditer(_COMMENT.sub("", line)):
+        try:
+            words = shlex.split(match.group(1))
+        except ValueError:
+            words = match.group(1).split()
+        if not words:
+            continue
+        target = _SCRIPT_DIR.sub("", " ".join(words[0].split()))
+        if "$" not in target and "`" not in target:
+            sources.append(target)
+    return tuple(sources)
+
+
+class SymbolIndex:
+    """Variablen und Funktionen eines Scripts mit ihren Definitionszeilen
+
+    Die Definitionen werden je Zeile gehalten. edit() verschiebt sie bei
+    eingefügten oder gelöschten Zeilen und merkt die geänderten Zeilen vor,
+    refresh() liest nur diese neu ein. Abfragen sind danach reine
+    Wörterbuch-Zugriffe.
+    """
+
+    EMPTY_LINE = ((), (), ())
+
+    def __init__(self):
+        # (Variablen, Funktionen, eingebundene Dateien) je Zeile, Index 0 = Zeile 1
+        self._lines = []
+        # Name -> Anzahl der Zeilen, die ihn definieren bzw. einbinden
+        self.variables = {}
+        self.functions = {}
+        self.sources = {}
+        # Neu einzulesender Bereich (erste, letzte Zeile), None = bis zum Ende
+        self.dirty_lines = (1, None)
+
+    def edit(self, first_line, line_delta=0):
+        """Vermerkt eine Änderung ab first_line um line_delta Zeilen"""
+        lines = self._lines
+        if len(lines) > first_line:
+            if line_delta > 0:
+                lines[first_line:first_line] = [self.EMPTY_LINE] * line_delta
+            elif line_delta < 0:
+                for symbols in lines[first_line : first_line - line_delta]:
+                    self._count(symbols, -1)
+                del lines[first_line : first_line - line_delta]
+
+        last_line = first_line + max(line_delta, 0)
+        if self.dirty_lines is not None:
+            old_first, old_last = self.dirty_lines
+            if old_first > first_line:
+                old_first = max(first_line, old_first + line_delta)
+            if old_last is not None and old_last >= first_line:
+                old_last = max(first_line, old_last + line_delta)
+            first_line = min(first_line, old_first)
+            last_line = None if old_last is None else max(last_line, old_last)
+        self.dirty_lines = (first_line, last_line)
+
+    def refresh(self, read_lines):
+        """Liest die vorgemerkten Zeilen neu ein
+
+        read_lines(first_line, last_line) liefert den Text dieser Zeilen als
+        Liste; last_line None steht für das Textende.
+        """
+        if self.dirty_lines is None:
+            return
+        first_line, last_line = self.dirty_lines
+        self.dirty_lines = None
+        texts = read_lines(first_line, last_line)
+        if last_line is None:
+            self.set_lines(first_line, texts, truncate=True)
+        else:
+            self.set_lines(first_line, texts)
+
+    def set_lines(self, first_line, texts, truncate=False):
+        """Ersetzt die Definitionen ab first_line durch die der Zeilen texts
+
+        Mit truncate endet der Text hinter diesen Zeilen.
+        """
+        lines = self._lines
+        end = first_line - 1 + len(texts)
+        if len(lines) < end:
+            lines.extend([self.EMPTY_LINE] * (end - len(lines)))
+        for line_number, text in enumerate(texts, first_line):
+            self._count(lines[line_number - 1], -1)
+            symbols = line_symbols(text) + (line_sources(text),)
+            lines[line_number - 1] = symbols
+            self._count(symbols, 1)
+        if truncate:
+            for symbols in lines[end:]:
+                self._count(symbols, -1)
+            del lines[end:]
+
+    def _count(self, symbols, delta):
+        """Zählt die Definitionen einer Zeile hinzu bzw. ab"""
+        for names, counts in zip(
+            symbols, (self.variables, self.functions, self.sources)
+        ):
+            for name in names:
+                count = counts.get(name, 0) + delta
+                if count:
+                    counts[name] = count
+                else:
+                    del counts[name]
+
+    def definition_lines(self, name):
+        """Liefert die Zeilen, in denen name als Variable oder Funktion definiert wird"""
+        if name not in self.variables and name not in self.functions:
+            return []
+        return [
+            line_number
+            for line_number, (variables, functions, _) in enumerate(self._lines, 1)
+            if name in variables or name in functions
+        ]
+
+
+class SourceIndex:
+    """Variablen und Funktionen der per source bzw. . eingebundenen Dateien
+
+    Jede Datei wird nur gelesen, wenn sich ihre mtime oder Größe seit dem
+    letzten Lesen geändert hat. Verschachtelte Einbindungen werden verfolgt,
+    jede Datei dabei höchstens einmal (Zyklen werden so erkannt).
+    """
+
+    def __init__(self):
+        # Pfad -> (mtime, Größe, Variablen, Funktionen, eingebundene Dateien)
+        self._files = {}
+        # Anzahl der bisher gelesenen Dateien
+        self.parsed_files = 0
+
+    @staticmethod
+    def resolve(target, directories):
+        """Sucht target relativ zu den Verzeichnissen; None, wenn nicht gefunden"""
+        target = os.path.expanduser(target)
+        for directory in directories:
+            path = os.path.realpath(os.path.join(directory, target))
+            if os.path.isfile(path):
+                return path
+            if os.path.isabs(target):
+                break
+        return None
+
+    def file_symbols(self, path):
+        """Liefert (Variablen, Funktionen, eingebundene Dateien) einer Datei
+
+        Gibt None zurück, wenn die Datei nicht gelesen werden kann.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        cached = self._files.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2:]
+
+        variables, functions, sources = set(), set(), []
+        try:
+            with open(path, encoding="utf-8", errors="replace") as script:
+                for line in script:
+                    line_variables, line_functions = line_symbols(line)
+                    variables.update(line_variables)
+                    functions.update(line_functions)
+                    sources.extend(line_sources(line))
+        except OSError:
+            return None
+        self.parsed_files += 1
+        entry = (frozenset(variables), frozenset(functions), tuple(sources))
+        self._files[path] = (stat.st_mtime_ns, stat.st_size) + entry
+        return entry
+
+    def symbols(self, sources, base_dir):
+        """Liefert (Variablen, Funktionen) aller eingebundenen Dateien
+
+        Ziele werden relativ zu base_dir (dem Verzeichnis des Scripts)
+        aufgelöst, verschachtelte zuerst relativ zur einbindenden Datei.
+        """
+        variables, functions = set(), set()
+        visited = set()
+        pending = [(target, (base_dir,)) for target in sources]
+        while pending:
+            target, directories = pending.pop()
+            path = self.resolve(target, directories)
+            if path is None or path in visited:
+                continue
+            visited.add(path)
+            entry = self.file_symbols(path)
+            if entry is None:
+                continue
+            variables.update(entry[0])
+            functions.update(entry[1])
+            nested_directories = (os.path.dirname(path), base_dir)
+            pending.extend((nested, nested_directories) for nested in entry[2])
+        return variables, functions
+
+
+def cache_file(name):
+    """Pfad einer Cache-Datei im Benutzer-Cache-Verzeichnis (XDG)"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "bash-script-maker", name)
+
+
+def read_cache(path, version):
+    """Liest die Einträge einer JSON-Cache-Datei
+
+    Eine fehlende, ungültige oder mit anderer Version geschriebene Datei
+    liefert einen leeren Cache.
+    """
+    try:
+        with open(path, encoding="utf-8") as cache:
+            data = json.load(cache)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != version:
+        return {}
+    entries = data.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def write_cache(path, version, entries):
+    """Schreibt die Einträge atomar in eine JSON-Cache-Datei; Fehler werden ignoriert"""
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary, "w", encoding="utf-8") as cache:
+            json.dump({"version": version, "entries": entries}, cache)
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+class ExecutableIndex:
+    """Ausführbare Programme aus allen Verzeichnissen in $PATH
+
+    Die Namen je Verzeichnis werden mit dessen Änderungszeit (mtime) auf der
+    Platte zwischengespeichert. Beim nächsten Laden werden nur Verzeichnisse
+    neu eingelesen, deren mtime sich geändert hat. Nachträglich mit chmod
+    ausführbar gemachte Dateien ändern die mtime nicht und werden erst nach
+    einer anderen Änderung im Verzeichnis gefunden.
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, path=None, cache_path=None):
+        self.path = os.environ.get("PATH", "") if path is None else path
+        self.cache_path = (
+            cache_file("path_executables.json") if cache_path is None else cache_path
+        )
+        self.names = frozenset()
+        # Anzahl der beim letzten Laden neu eingelesenen Verzeichnisse
+        self.scanned_directories = 0
+
+    def directories(self):
+        """Liefert die Verzeichnisse aus path ohne Duplikate, in Suchreihenfolge"""
+        return list(
+            dict.fromkeys(entry for entry in self.path.split(os.pathsep) if entry)
+        )
+
+    def load(self):
+        """Liest $PATH ein, nutzt dabei den Cache, und gibt alle Namen zurück
+
+        Blockiert; ist für einen Hintergrund-Thread gedacht.
+        """
+        cached = self._read_cache()
+        directories = {}
+        self.scanned_directories = 0
+        for directory in self.directories():
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            entry = cached.get(directory)
+            if entry is None or entry.get("mtime") != mtime:
+                entry = {"mtime": mtime, "names": self.scan_directory(directory)}
+                self.scanned_directories += 1
+            directories[directory] = entry
+
+        if directories != cached:
+            self._write_cache(directories)
+        self.names = frozenset(
+            name for entry in directories.values() for name in entry["names"]
+        )
+        return self.names
+
+    @staticmethod
+    def scan_directory(directory):
+        """Liefert die Namen aller ausführbaren Dateien eines Verzeichnisses"""
+        names = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and os.access(entry.path, os.X_OK):
+                            names.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return sorted(names)
+
+    def _read_cache(self):
+        """Liest den Cache; ein fehlender oder ungültiger Cache ist leer"""
+        return read_cache(self.cache_path, self.CACHE_VERSION)
+
+    def _write_cache(self, directories):
+        """Schreibt den Cache; Fehler werden ignoriert"""
+        write_cache(self.cache_path, self.CACHE_VERSION, directories)
+
+
+class DirectoryCache:
+    """Zwischengespeicherte Verzeichnisinhalte für die Pfadvervollständigung
+
+    Gelesen wird mit os.scandir; ob ein Eintrag ein Verzeichnis ist, liefert
+    meist schon der Verzeichniseintrag selbst, ohne eigenen stat-Aufruf.
+    Innerhalb von ttl Sekunden wird eine Liste ungeprüft wiederverwendet,
+    danach nur, wenn sich die mtime des Verzeichnisses nicht geändert hat.
+    listing() darf aus Hintergrund-Threads aufgerufen werden.
+    """
+
+    def __init__(self, ttl=2.0, max_directories=64, batch_size=256):
+        self.ttl = ttl
+        self.max_directories = max_directories
+        # Einträge pro Teilergebnis beim Einlesen, siehe scan()
+        self.batch_size = batch_size
+        # Verzeichnis -> (mtime, Zeitpunkt der Prüfung, sortierte Einträge)
+        self._listings = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Verwirft alle zwischengespeicherten Verzeichnisse"""
+        with self._lock:
+            self._listings.clear()
+
+    def peek(self, directory):
+        """Liefert die Einträge, wenn sie ohne Plattenzugriff gültig sind, sonst None"""
+        with self._lock:
+            cached = self._listings.get(directory)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            return cached[2]
+        return None
+
+    def listing(self, directory, cancelled=None, on_batch=None):
+        """Liefert die Einträge als sortierte Liste von (Name, ist_Verzeichnis)
+
+        Wird neu eingelesen, erhält on_batch die Einträge in Teilen, sobald
+        sie gelesen sind. Ist das threading.Event cancelled gesetzt, bricht
+        das Einlesen ab und es wird None zurückgegeben. Wirft OSError, wenn
+        das Verzeichnis nicht gelesen werden kann.
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._listings.pop(directory, None)
+        if cached is not None:
+            mtime, checked, entries = cached
+            if now - checked < self.ttl or os.stat(directory).st_mtime_ns == mtime:
+                self._store(directory, (mtime, now, entries))
+                return entries
+
+        mtime = os.stat(directory).st_mtime_ns
+        entries = self.scan(directory, cancelled, on_batch)
+        if entries is not None:
+            self._store(directory, (mtime, now, entries))
+        return entries
+
+    def _store(self, directory, listing):
+        """Merkt sich eine Liste; die am längsten nicht genutzten fallen heraus"""
+        with self._lock:
+            self._listings[directory] = listing
+            while len(self._listings) > self.max_directories:
+                del self._listings[next(iter(self._listings))]
+
+    def scan(self, directory, cancelled=None, on_batch=None):
+        """Liest ein Verzeichnis ohne Cache, siehe listing()"""
+        entries = []
+        reported = 0
+        with os.scandir(directory) as dir_entries:
+            for entry in dir_entries:
+                if cancelled is not None and cancelled.is_set():
+                    return None
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                entries.append((entry.name, is_dir))
+                if on_batch is not None and len(entries) - reported >= self.batch_size:
+                    on_batch(entries[reported:])
+                    reported = len(entries)
+        if on_batch is not None and reported < len(entries):
+            on_batch(entries[reported:])
+        entries.sort()
+        return entries
+
+    @staticmethod
+    def prefix_matches(entries, prefix):
+        """Liefert die Einträge einer sortierten Liste mit dem Anfang prefix"""
+        matches = []
+        for index in range(bisect.bisect_left(entries, (prefix,)), len(entries)):
+            name, is_dir = entries[index]
+            if not name.startswith(prefix):
+                break
+            matches.append((name, is_dir))
+        return matches
+
+    def complete(self, directory, prefix):
+        """Liefert die Einträge mit dem Anfang prefix per Binärsuche"""
+        return self.prefix_matches(self.listing(directory), prefix)
+
+
+# Option am Anfang einer Hilfezeile, z.B. "-a, --all" oder "--color[=WANN]"
+_OPTION = re.compile(r"(?<![\w-])(--?[A-Za-z0-9][A-Za-z0-9_-]*)")
+# Hervorhebungen per Überschreiben in formatierten man-Seiten ("a\ba", "_\ba")
+_OVERSTRIKE = re.compile(r".\x08")
+
+
+def parse_options(help_text):
+    """Liefert die Optionen, die in einer --help- oder man-Ausgabe beschrieben werden
+
+    Berücksichtigt werden nur Zeilen, die (eingerückt) mit einer Option
+    beginnen; gelesen wird bis zur ersten Lücke aus zwei Leerzeichen, hinter
+    der die Beschreibung folgt.
+    """
+    options = set()
+    for line in _OVERSTRIKE.sub("", help_text).splitlines():
+        line = line.strip()
+        if not line.startswith("-"):
+            continue
+        spec = re.split(r"\s{2,}|\t", line, maxsplit=1)[0]
+        options.update(_OPTION.findall(spec))
+    options.discard("-")
+    options.discard("--")
+    return sorted(options)
+
+
+class OptionIndex:
+    """Optionen installierter Befehle aus ihrer man-Seite bzw. --help-Ausgabe
+
+    Die Optionen werden beim ersten Bedarf je Befehl in einem
+    Hintergrund-Thread ermittelt (request) und auf der Platte
+    zwischengespeichert, je Programmpfad zusammen mit dessen mtime. Zuerst
+    wird die man-Seite gelesen; nur ohne sie wird das Programm selbst mit
+    --help aufgerufen. Beides wird nach timeout Sekunden abgebrochen.
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_path=None, timeout=2.0, path=None):
+        self.cache_path = (
+            cache_file("command_options.json") if cache_path is None else cache_path
+        )
+        self.timeout = timeout
+        self.path = path  # Suchpfad für Befehle, None = $PATH
+        self._cache = None  # Programmpfad -> {"mtime": ..., "options": [...]}
+        self._lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._worker = None
+        # Befehle, deren Einlesen angefordert, aber noch nicht beendet ist
+        self.pending = set()
+        # Befehle, deren Einlesen beendet ist (vom Aufrufer abzuholen)
+        self.indexed = queue.Queue()
+
+    def _entries(self):
+        """Lädt den Cache beim ersten Zugriff"""
+        with self._lock:
+            if self._cache is None:
+                self._cache = read_cache(self.cache_path, self.CACHE_VERSION)
+            return self._cache
+
+    def _program(self, command):
+        """Liefert (Programmpfad, mtime) oder None, wenn der Befehl fehlt"""
+        if not command or os.sep in command:
+            return None
+        program = shutil.which(command, path=self.path)
+        if program is None:
+            return None
+        try:
+            return program, os.stat(program).st_mtime_ns
+        except OSError:
+            return None
+
+    def options(self, command):
+        """Liefert die zwischengespeicherten Optionen oder None, falls unbekannt"""
+        program = self._program(command)
+        if program is None:
+            return None
+        path, mtime = program
+        entry = self._entries().get(path)
+        if entry is None or entry.get("mtime") != mtime:
+            return None
+        return entry["options"]
+
+    def request(self, command):
+        """Fordert das Einlesen der Optionen im Hintergrund an
+
+        Gibt False zurück, wenn der Befehl bereits bekannt, angefordert oder
+        nicht installiert ist. Nach dem Einlesen steht der Befehl in indexed.
+        """
+        if command in self.pending or self._program(command) is None:
+            return False
+        if self.options(command) is not None:
+            return False
+        self.pending.add(command)
+        self._requests.put(command)
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run_worker, daemon=True)
+            self._worker.start()
+        return True
+
+    def _run_worker(self):
+        """Arbeitet die Anforderungen ab (läuft im Hintergrund-Thread)"""
+        while True:
+            command = self._requests.get()
+            try:
+                self.index_command(command)
+            finally:
+                self.pending.discard(command)
+                self.indexed.put(command)
+
+    def index_command(self, command):
+        """Liest die Optionen eines Befehls ein und speichert sie (blockiert)"""
+        program = self._program(command)
+        if program is None:
+            return []
+        path, mtime = program
+        options = parse_options(self._man_page(command))
+        if not options:
+            options = parse_options(self._help_output(path))
+        entries = self._entries()
+        with self._lock:
+            entries[path] = {"mtime": mtime, "options": options}
+            write_cache(self.cache_path, self.CACHE_VERSION, entries)
+        return options
+
+    def _run(self, arguments, env=None):
+        """Führt ein Programm ohne Eingabe aus und liefert seine Ausgabe"""
+        environment = dict(os.environ, LC_ALL="C", **(env or {}))
+        try:
+            result = subprocess.run(
+                arguments,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                env=environment,
+                timeout=self.timeout,
+                start_new_session=True,
+            )
+        except (OSError, subprocess.SubprocessError):
+            return ""
+        return result.stdout.decode("utf-8", "replace")
+
+    def _man_page(self, command):
+        """Formatierte man-Seite des Befehls, leer wenn keine vorhanden ist"""
+        if shutil.which("man") is None:
+            return ""
+        return self._run(["man", command], {"MANPAGER": "cat", "MANWIDTH": "120"})
+
+    def _help_output(self, path):
+        """Ausgabe von programm --help"""
+        return self._run([path, "--help"])
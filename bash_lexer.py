@@ -0,0 +1,705 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tk-unabhängiger Lexer für Bash-Scripts
+
+Liefert Tokens als (typ, start, ende) mit Zeichen-Offsets, wahlweise für
+einen String oder für einen beliebigen Zeilen-Iterator (z.B. ein geöffnetes
+File). Beim Zeilen-Iterator wird immer nur eine Zeile im Speicher gehalten,
+so dass auch Dateien verarbeitet werden können, die nicht in den Speicher
+passen.
+"""
+
+import bisect
+import re
+import sys
+
+# Lexer-Zustand am Zeilenanfang: (offenes Anführungszeichen, ausstehende
+# Heredocs als (Endmarke, Tabs entfernen), Stapel offener case-Blöcke)
+INITIAL_STATE = (None, (), ())
+
+HEREDOC_PATTERN = r"<(?<!<<)<(?!<)-?[ \t]*(?:'[^'\n]*'|\"[^\"\n]*\"|\\?[A-Za-z_][\w-]*)"
+
+# Syntax-Muster für Bash. Die Reihenfolge legt den Vorrang im kombinierten
+# Lexer fest: an jeder Position gewinnt das erste Muster. Kein Muster darf bei
+# einem Fehlschlag mehr als bis zum nächsten möglichen Trennzeichen zurück-
+# greifen; Strings und Kommentare werden daher nur an ihrem Anfangszeichen
+# erkannt und in tokenize_line() linear bis zum Ende durchsucht. Jedes Muster
+# beginnt mit einem festen Zeichen(-bereich), Bedingungen an das Zeichen davor
+# folgen erst dahinter als Lookbehind: so scheitern die Alternativen an den
+# meisten Positionen schon am ersten Zeichen.
+PATTERNS = {
+    "shebang": r"#(?<=^#)!/.*bash.*$",  # Shebang
+    "comments": r"#(?<![^\s;&|()<>]#)",  # Kommentare am Wortanfang (bis Zeilenende)
+    "strings": r"[\"']",  # Strings (bis zum schließenden Anführungszeichen)
+    "variables": r"\$(?:[A-Za-z_][A-Za-z0-9_]*|\{[^{}\n]+\})",  # Variablen
+    "operators": r"-(?<![\w-]-)(?:eq|ne|lt|le|gt|ge|f|d|e|r|w|x)\b|&&|\|\||==|!=|=~",  # Operatoren
+    "numbers": r"\d(?<!\w\d)\d*(?!\w)",  # Zahlen
+    "commands": r"[A-Za-z_](?<!\w.)[A-Za-z0-9_-]*",  # Wörter, Befehle per Mengen-Lookup
+    "brackets": r"[(){}[\]]",  # Klammern
+}
+
+# Zusätzliche Lexer-Muster ohne eigenen Token-Typ, die den Zeilenzustand
+# verändern; sie werden direkt hinter dem genannten Muster eingereiht
+STATE_PATTERNS = {
+    "variables": ("heredoc", HEREDOC_PATTERN),  # Heredoc-Beginn
+    "brackets": ("case_separator", r";;&?|;&"),  # Ende eines case-Zweigs
+}
+
+# Wörter, die als Befehle & Schlüsselwörter gemeldet werden
+COMMAND_WORDS = frozenset(
+    {
+        "echo",
+        "read",
+        "if",
+        "then",
+        "else",
+        "elif",
+        "fi",
+        "for",
+        "while",
+        "do",
+        "done",
+        "case",
+        "esac",
+        "function",
+        "return",
+        "exit",
+        "cd",
+        "ls",
+        "pwd",
+        "mkdir",
+        "rm",
+        "cp",
+        "mv",
+        "chmod",
+        "chown",
+        "grep",
+        "sed",
+        "awk",
+        "cat",
+        "head",
+        "tail",
+        "sort",
+        "uniq",
+        "wc",
+        "find",
+        "ps",
+        "kill",
+        "sudo",
+        "apt",
+        "yum",
+        "dnf",
+        "pacman",
+    }
+)
+
+# Öffnende Elemente und ihr schließendes Gegenstück für den Paar-Index
+PAIR_OPENERS = {"(": ")", "{": "}", "[": "]", "if": "fi", "do": "done", "case": "esac"}
+PAIR_CLOSERS = {closer: opener for opener, closer in PAIR_OPENERS.items()}
+
+# Elemente, die für die Einrückung einen Block öffnen, und ihr Gegenstück
+INDENT_OPENERS = {"(": ")", "{": "}", "if": "fi", "do": "done", "case": "esac"}
+INDENT_CLOSERS = {closer: opener for opener, closer in INDENT_OPENERS.items()}
+# Schlüsselwörter, die ihre Zeile auf die Ebene des zugehörigen if setzen
+INDENT_MIDDLES = frozenset({"then", "elif", "else"})
+# Zeichen und Wörter, hinter denen ein neuer Befehl beginnt
+COMMAND_SEPARATORS = frozenset(";&|(){}")
+COMMAND_PREFIX_WORDS = frozenset({"then", "do", "else", "if", "elif", "while", "until"})
+
+
+def pair_events(line, tokens):
+    """Ermittelt Klammern und Block-Schlüsselwörter einer Zeile aus ihren Tokens
+
+    Liefert ein Tupel aus (start_col, end_col, text). Schlüsselwörter zählen
+    wie bei der Einrückung nur an Befehlsposition, "echo done" schließt also
+    keine Schleife.
+    """
+    events = []
+    for token_type, start, end in tokens:
+        if token_type == "brackets" or token_type == "commands":
+            text = line[start:end]
+            if text not in PAIR_OPENERS and text not in PAIR_CLOSERS:
+                continue
+            if token_type == "commands" and not IndentEngine.at_command_start(
+                line, start
+            ):
+                continue
+            events.append((start, end, text))
+    return tuple(events)
+
+
+class BashLexer:
+    """Zeilenbasierter Lexer für Bash-Scripts"""
+
+    INITIAL_STATE = INITIAL_STATE
+
+    def __init__(self, command_words=None):
+        self.patterns = dict(PATTERNS)
+        self.state_patterns = dict(STATE_PATTERNS)
+        self.command_words = set(
+            COMMAND_WORDS if command_words is None else command_words
+        )
+        # Programme z.B. aus $PATH; sie werden nur an Befehlsposition gemeldet,
+        # da Namen wie "test" oder "file" auch als Argumente häufig sind
+        self.path_words = set()
+
+        # Alle Muster als eine Alternation mit benannten Gruppen
+        token_patterns = []
+        for token_type, pattern in self.patterns.items():
+            token_patterns.append(f"(?P<{token_type}>{pattern})")
+            if token_type in self.state_patterns:
+                state_name, state_pattern = self.state_patterns[token_type]
+                token_patterns.append(f"(?P<{state_name}>{state_pattern})")
+        self.token_regex = re.compile("|".join(token_patterns), re.MULTILINE)
+
+    def tokenize(self, text_content, state=None):
+        """Zerlegt den Text in einem Durchlauf in nicht überlappende Tokens
+
+        Liefert Tupel (typ, start, ende) mit Zeichen-Offsets im Text.
+        Wörter werden nur dann als Befehl gemeldet, wenn sie in
+        command_words enthalten sind, Wörter aus path_words nur an
+        Befehlsposition.
+        """
+        return self.tokenize_lines(text_content.split("\n"), state)
+
+    def tokenize_lines(self, lines, state=None):
+        """Zerlegt einen Zeilen-Iterator, ohne den Text vollständig zu laden
+
+        Die Zeilen dürfen mit oder ohne abschließendes \\n geliefert werden
+        (z.B. direkt aus einem geöffneten File). Liefert wie tokenize()
+        Tupel (typ, start, ende) mit Offsets ab dem ersten Zeichen.
+        """
+        if state is None:
+            state = self.INITIAL_STATE
+        offset = 0
+        for line in lines:
+            length = len(line)
+            if line.endswith("\n"):
+                line = line[:-1]
+            else:
+                length += 1  # Zeilentrenner von split("\n")
+            tokens, state = self.tokenize_line(line, state)
+            for token_type, start, end in tokens:
+                yield token_type, offset + start, offset + end
+            offset += length
+
+    def iter_line_tokens(self, lines, state=None):
+        """Liefert pro Zeile (Zeilennummer, Tokens, Zustand am Zeilenende)
+
+        Die Spalten der Tokens beziehen sich auf die jeweilige Zeile; die
+        Zeilennummern beginnen wie im Text-Widget bei 1.
+        """
+        if state is None:
+            state = self.INITIAL_STATE
+        for line_number, line in enumerate(lines, 1):
+            if line.endswith("\n"):
+                line = line[:-1]
+            tokens, state = self.tokenize_line(line, state)
+            yield line_number, tokens, state
+
+    def tokenize_line(self, line, state):
+        """Zerlegt eine Zeile ausgehend vom Zustand am Zeilenanfang
+
+        Gibt die Tokens der Zeile als (typ, start_col, end_col) und den
+        Zustand am Zeilenende zurück.
+        """
+        quote, heredocs, cases = state
+        tokens = []
+
+        # Heredoc-Rumpf: die ganze Zeile ist Text, bis die Endmarke folgt
+        if quote is None and heredocs:
+            delimiter, strip_tabs = heredocs[0]
+            body = line.lstrip("\t") if strip_tabs else line
+            if body == delimiter:
+                tokens.append(("operators", len(line) - len(body), len(line)))
+                return tokens, (None, heredocs[1:], cases)
+            if line:
+                tokens.append(("strings", 0, len(line)))
+            return tokens, state
+
+        # Fortsetzung eines Strings aus der Vorzeile
+        pos = 0
+        if quote is not None:
+            end = self._find_closing_quote(line, quote)
+            if end < 0:
+                if line:
+                    tokens.append(("strings", 0, len(line)))
+                return tokens, state
+            tokens.append(("strings", 0, end))
+            pos = end
+            quote = None
+
+        heredocs = list(heredocs)
+        cases = list(cases)
+        command_words = self.command_words
+        path_words = self.path_words
+        search = self.token_regex.search
+        # Ende des aktuellen Arithmetik-Ausdrucks ((...)) bzw. $((...))
+        arithmetic_end = 0
+        while True:
+            match = search(line, pos)
+            if match is None:
+                break
+            kind = match.lastgroup
+            start, pos = match.span()
+            if kind == "strings":
+                end = self._find_closing_quote(line, match.group(), pos)
+                if end < 0:
+                    # String läuft über das Zeilenende
+                    quote = match.group()
+                    tokens.append((kind, start, len(line)))
+                    break
+                tokens.append((kind, start, end))
+                pos = end
+            elif kind == "comments":
+                tokens.append((kind, start, len(line)))
+                break
+            elif kind == "heredoc":
+                if start < arithmetic_end:
+                    # In ((...)) ist << eine Bit-Verschiebung
+                    pos = start + 2
+                    continue
+                heredocs.append(self._parse_heredoc(match.group()))
+                tokens.append(("operators", start, pos))
+            elif kind == "commands":
+                word = match.group()
+                # Außerhalb von case-Blöcken zählt für den Zustand nur "case"
+                if (cases or word == "case") and self._update_case_state(cases, word):
+                    continue
+                if word in command_words:
+                    tokens.append((kind, start, pos))
+                elif word in path_words and IndentEngine.at_command_start(line, start):
+                    tokens.append((kind, start, pos))
+            elif kind == "case_separator":
+                if cases and cases[-1] == "body":
+                    cases[-1] = "pattern"
+            else:
+                if kind == "brackets":
+                    bracket = match.group()
+                    if bracket == "(":
+                        if start >= arithmetic_end and line.startswith("(", pos):
+                            arithmetic_end = self._find_arithmetic_end(line, start)
+                    elif bracket == ")" and cases and cases[-1] == "pattern":
+                        cases[-1] = "body"
+                tokens.append((kind, start, pos))
+
+        return tokens, (quote, tuple(heredocs), tuple(cases))
+
+    @staticmethod
+    def _find_closing_quote(line, quote, pos=0):
+        """Sucht das schließende Anführungszeichen, gibt die Position danach zurück
+
+        Jedes Zeichen ab pos wird höchstens zweimal betrachtet, die Laufzeit
+        ist also linear in der Zeilenlänge. In '...' gibt es keine Escapes.
+        """
+        while True:
+            end = line.find(quote, pos)
+            if end < 0:
+                return -1
+            if quote == "'":
+                return end + 1
+            # Anzahl der direkt vorangehenden Backslashes prüfen
+            first = end
+            while first > pos and line[first - 1] == "\\":
+                first -= 1
+            if (end - first) % 2 == 0:
+                return end + 1
+            pos = end + 1
+
+    @staticmethod
+    def _find_arithmetic_end(line, pos):
+        """Sucht das Ende des bei pos beginnenden ((...)), sonst das Zeilenende"""
+        depth = 0
+        for index in range(pos, len(line)):
+            char = line[index]
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+                if depth == 0:
+                    return index + 1
+        return len(line)
+
+    @staticmethod
+    def _parse_heredoc(operator):
+        """Ermittelt Endmarke und Tab-Verhalten aus z.B. <<-'EOF'"""
+        rest = operator[2:]
+        strip_tabs = rest.startswith("-")
+        delimiter = rest.lstrip("-").strip().strip("'\"").lstrip("\\")
+        return delimiter, strip_tabs
+
+    @staticmethod
+    def _update_case_state(cases, word):
+        """Verfolgt case-Blöcke; gibt True zurück, wenn das Wort ein Muster ist
+
+        Innerhalb eines case-Blocks wechseln Muster (vor der schließenden
+        Klammer) und Befehle (bis ;;) einander ab.
+        """
+        mode = cases[-1] if cases else None
+        if mode == "head":
+            if word == "in":
+                cases[-1] = "pattern"
+            return False
+        if mode == "pattern":
+            if word == "esac":
+                cases.pop()
+                return False
+            return True
+        if word == "case":
+            cases.append("head")
+        elif word == "esac" and cases:
+            cases.pop()
+        return False
+
+
+class _PairLine:
+    """Vorkommen einer Zeile im Paar-Index samt ihren Partnern"""
+
+    __slots__ = ("events", "partners")
+
+    def __init__(self):
+        # (start_col, end_col, text) je Vorkommen, None = noch nicht gelext
+        self.events = None
+        # Partner je Vorkommen als (_PairLine, Index) oder None
+        self.partners = None
+
+
+class BlockPairIndex:
+    """Index zusammengehöriger Klammern und Blöcke (if/fi, do/done, case/esac)
+
+    Gepflegt werden die Klammer- und Schlüsselwort-Vorkommen jeder Zeile
+    sowie der Stapel offener Elemente an jedem Zeilenanfang. Ändern sich
+    Vorkommen, wird beim nächsten Abruf ab der ersten geänderten Zeile neu
+    zugeordnet, bis der Stapel wieder dem gespeicherten entspricht; das
+    geschieht ohne Zugriff auf den Text. Partner verweisen auf ihre Zeile,
+    nicht auf deren Nummer, und bleiben so beim Einfügen und Löschen von
+    Zeilen gültig.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    @property
+    def line_events(self):
+        """Vorkommen je Zeile (Index 0 = Zeile 1), None = noch nicht gelext"""
+        return [line.events for line in self._lines]
+
+    def set_line(self, line_number, events):
+        """Übernimmt die Vorkommen einer Zeile (siehe pair_events)"""
+        lines = self._lines
+        if len(lines) < line_number:
+            # Der Stapel hinter der bisher letzten Zeile ist noch unbekannt
+            self._mark_dirty(max(len(lines), 1), line_number)
+            while len(lines) < line_number:
+                lines.append(_PairLine())
+                self._stacks.append(())
+        line = lines[line_number - 1]
+        if line.events != events:
+            line.events = events
+            self._mark_dirty(line_number, line_number)
+
+    def splice(self, line_number, line_delta):
+        """Zieht den Index nach einer Änderung ab Zeile line_number nach
+
+        Die geänderte Zeile gilt danach als unbekannt, dahinter werden
+        line_delta Zeilen eingefügt bzw. entfernt.
+        """
+        lines = self._lines
+        stacks = self._stacks
+        if len(lines) < line_number:
+            return
+        changed = bool(lines[line_number - 1].events)
+        lines[line_number - 1].events = None
+        if line_delta > 0:
+            lines[line_number:line_number] = [_PairLine() for _ in range(line_delta)]
+            # Leere Zeilen ändern den Stapel nicht
+            stacks[line_number:line_number] = [stacks[line_number - 1]] * line_delta
+        elif line_delta < 0:
+            removed = lines[line_number : line_number - line_delta]
+            changed = changed or any(line.events for line in removed)
+            del lines[line_number : line_number - line_delta]
+            del stacks[line_number : line_number - line_delta]
+
+        if self._dirty is not None:
+            first, last = self._dirty
+            if first > line_number:
+                first = max(line_number, first + line_delta)
+            if last > line_number:
+                last = max(line_number, last + line_delta)
+            self._dirty = (first, last)
+        if changed:
+            self._mark_dirty(line_number, line_number + max(line_delta, 0))
+
+    def clear(self):
+        """Verwirft den gesamten Index"""
+        self._lines = []
+        # Stapel offener Elemente am Anfang jeder Zeile als verkettete
+        # Tupel (text, Zeile, Index, darunter); None = leer, () = unbekannt
+        self._stacks = []
+        # Neu zuzuordnender Zeilenbereich (erste, letzte) oder None
+        self._dirty = None
+
+    def _mark_dirty(self, first_line, last_line):
+        """Merkt einen Zeilenbereich zum erneuten Zuordnen vor"""
+        if self._dirty is not None:
+            first_line = min(first_line, self._dirty[0])
+            last_line = max(last_line, self._dirty[1])
+        self._dirty = (first_line, last_line)
+
+    @staticmethod
+    def _same_stack(stack, saved):
+        """Vergleicht zwei Stapel; gemeinsame Reste werden nicht durchlaufen"""
+        while stack is not saved:
+            if not stack or not saved:
+                return False
+            if stack[0] != saved[0] or stack[1] is not saved[1] or stack[2] != saved[2]:
+                return False
+            stack, saved = stack[3], saved[3]
+        return True
+
+    def _update(self):
+        """Ordnet ab der ersten geänderten Zeile neu zu, bis der Stapel passt"""
+        first_line, last_line = self._dirty
+        self._dirty = None
+        lines = self._lines
+        stacks = self._stacks
+        stack = stacks[first_line - 1] if first_line > 1 else None
+        for index in range(first_line - 1, len(lines)):
+            if index >= last_line and self._same_stack(stack, stacks[index]):
+                return
+            stacks[index] = stack
+            stack = self._pair_line(lines[index], stack)
+
+    @staticmethod
+    def _pair_line(line, stack):
+        """Ordnet die Vorkommen einer Zeile zu und liefert den Stapel danach
+
+        Jeder offene Block (if, do, case) bildet eine eigene Ebene, Klammern
+        werden nur innerhalb ihrer Ebene zugeordnet. So schließt z.B. das
+        ")" eines case-Musters keine Klammer außerhalb des case-Blocks.
+        Nicht geschlossene Elemente innerhalb eines Paars werden verworfen.
+        """
+        events = line.events
+        old_partners = line.partners or ()
+        if not events:
+            line.partners = None
+            return stack
+        partners = line.partners = [None] * len(events)
+        for index, (_, _, text) in enumerate(events):
+            if text in PAIR_OPENERS:
+                # Ein hinter dem neu zugeordneten Bereich geschlossenes Element
+                # behält seinen Partner; veraltete Verweise erkennt find_pair
+                if index < len(old_partners):
+                    partners[index] = old_partners[index]
+                stack = (text, line, index, stack)
+                continue
+            opener = PAIR_CLOSERS[text]
+            block = len(opener) > 1
+            node = stack
+            while node is not None and node[0] != opener:
+                if not block and len(node[0]) > 1:
+                    node = None  # Klammer ohne Gegenstück in dieser Ebene
+                    break
+                node = node[3]
+            if node is None:
+                continue  # schließendes Element ohne Gegenstück
+            _, opener_line, opener_index, stack = node
+            partners[index] = (opener_line, opener_index)
+            opener_line.partners[opener_index] = (line, index)
+        return stack
+
+    def find_pair(self, line_number, col):
+        """Liefert das Paar am bzw. direkt vor der Position oder None
+
+        Das Ergebnis sind zwei (zeile, start_col, end_col) in
+        Dokumentreihenfolge.
+        """
+        if self._dirty is not None:
+            self._update()
+        lines = self._lines
+        if not 0 < line_number <= len(lines):
+            return None
+        line = lines[line_number - 1]
+        if not line.events or not line.partners:
+            return None
+        index = bisect.bisect_right([start for start, _, _ in line.events], col) - 1
+        if index < 0 or col > line.events[index][1]:
+            return None
+
+        partner = line.partners[index]
+        if partner is None:
+            return None
+        partner_line, partner_index = partner
+        # Verweise auf inzwischen neu zugeordnete Zeilen sind veraltet
+        back = partner_line.partners
+        if not back or partner_index >= len(back):
+            return None
+        if back[partner_index] != (line, index):
+            return None
+        # Nur schließende Elemente werden stets neu zugeordnet; ein Öffner,
+        # dessen Partner inzwischen selbst öffnet, ist daher veraltet
+        text = line.events[index][2]
+        partner_text = partner_line.events[partner_index][2]
+        if PAIR_OPENERS.get(text) != partner_text:
+            if PAIR_OPENERS.get(partner_text) != text:
+                return None
+        try:
+            partner_number = lines.index(partner_line) + 1
+        except ValueError:
+            return None  # Zeile wurde gelöscht
+
+        start, end, _ = line.events[index]
+        partner_start, partner_end, _ = partner_line.events[partner_index]
+        return tuple(
+            sorted(
+                (
+                    (line_number, start, end),
+                    (partner_number, partner_start, partner_end),
+                )
+            )
+        )
+
+
+class IndentEngine:
+    """Berechnet die Einrückungsebene Zeile für Zeile aus den Tokens des Lexers
+
+    Offene Blöcke (if, do, case, Klammern) liegen auf einem Stapel. Jede
+    Zeile wird genau einmal gelext, ein ganzer Text also in einem linearen
+    Durchlauf eingerückt. Schlüsselwörter zählen nur an Befehlsposition, so
+    dass z.B. "done_flag=1" oder "echo fi" die Einrückung nicht verändern.
+    """
+
+    def __init__(self, lexer=None, state=INITIAL_STATE):
+        self.lexer = lexer if lexer is not None else BashLexer()
+        # Lexer-Zustand am Anfang der nächsten Zeile
+        self.state = state
+        # Offene Blöcke als [Element, Ebene des Inhalts, im case-Zweig]
+        self.blocks = []
+        # Die vorige Zeile endet mit einem Backslash
+        self.continued = False
+
+    @property
+    def level(self):
+        """Ebene, auf der die nächste Zeile beginnt"""
+        return self._content_level() + (1 if self.continued else 0)
+
+    def _content_level(self):
+        """Ebene des Inhalts des innersten offenen Blocks"""
+        if not self.blocks:
+            return 0
+        _, level, in_branch = self.blocks[-1]
+        return level + 1 if in_branch else level
+
+    @staticmethod
+    def at_command_start(line, col):
+        """Prüft, ob an Position col ein Befehl beginnen kann"""
+        pos = col
+        while pos > 0 and line[pos - 1] in " \t":
+            pos -= 1
+        if pos == 0 or line[pos - 1] in COMMAND_SEPARATORS:
+            return True
+        word_start = pos
+        while word_start > 0 and (
+            line[word_start - 1].isalnum() or line[word_start - 1] == "_"
+        ):
+            word_start -= 1
+        return line[word_start:pos] in COMMAND_PREFIX_WORDS
+
+    def feed(self, line):
+        """Verarbeitet die nächste Zeile und liefert ihre Einrückungsebene
+
+        None bedeutet, dass die Zeile in einem String oder Heredoc beginnt;
+        ihre Einrückung gehört zum Inhalt und darf nicht verändert werden.
+        """
+        quote, heredocs, cases = self.state
+        tokens, self.state = self.lexer.tokenize_line(line, self.state)
+        blocks = self.blocks
+        if blocks and blocks[-1][0] == "case":
+            # Muster oder Befehle eines case-Zweigs, siehe BashLexer
+            blocks[-1][2] = bool(cases) and cases[-1] == "body"
+
+        raw = quote is not None or bool(heredocs)
+        level = None if raw else self.level
+        leading = not raw and not self.continued
+        first_col = len(line) - len(line.lstrip())
+        for token_type, start, end in tokens:
+            if token_type == "brackets":
+                word = line[start:end]
+            elif token_type == "commands" and self.at_command_start(line, start):
+                word = line[start:end]
+            else:
+                leading = False
+                continue
+
+            if word in INDENT_OPENERS:
+                blocks.append([word, self._content_level() + 1, False])
+            elif word in INDENT_CLOSERS:
+                opener = INDENT_CLOSERS[word]
+                if blocks and blocks[-1][0] == opener:
+                    blocks.pop()
+                elif word == ")" and blocks and blocks[-1][0] == "case":
+                    blocks[-1][2] = True  # Ende eines case-Musters
+                elif len(opener) > 1 and any(b[0] == opener for b in blocks):
+                    # Nicht geschlossene Klammern im Block werden verworfen
+                    while blocks.pop()[0] != opener:
+                        pass
+                if leading and start == first_col:
+                    level = self._content_level()
+            elif word in INDENT_MIDDLES:
+                if leading and start == first_col and blocks:
+                    if blocks[-1][0] == "if":
+                        level = blocks[-1][1] - 1
+            leading = False
+
+        self.continued = (
+            line.endswith("\\")
+            and (len(line) - len(line.rstrip("\\"))) % 2 == 1
+            and self.state[0] is None
+            and not self.state[1]
+            and not (tokens and tokens[-1][0] == "comments")
+        )
+        return level
+
+
+def indent_levels(lines, lexer=None):
+    """Liefert die Einrückungsebene jeder Zeile (siehe IndentEngine.feed)"""
+    engine = IndentEngine(lexer)
+    return [engine.feed(line) for line in lines]
+
+
+def reindent_lines(lines, indent="    ", lexer=None):
+    """Rückt Zeilen neu ein
+
+    Zeilen, die in einem String oder Heredoc beginnen, bleiben unverändert,
+    Zeilen aus Leerzeichen werden geleert.
+    """
+    result = []
+    for line, level in zip(lines, indent_levels(lines, lexer)):
+        if level is None:
+            result.append(line)
+        else:
+            code = line.lstrip(" \t")
+            result.append(indent * level + code if code else "")
+    return result
+
+
+def main(argv=None):
+    """Gibt die Tokens einer Datei (oder von stdin) zeilenweise aus"""
+    argv = sys.argv[1:] if argv is None else argv
+    lexer = BashLexer()
+    if argv:
+        stream = open(argv[0], encoding="utf-8", errors="replace")
+    else:
+        stream = sys.stdin
+    try:
+        for token_type, start, end in lexer.tokenize_lines(stream):
+            print(f"{token_type}\t{start}\t{end}")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -77,7 +77,7 @@ import webbrowser
 from datetime import datetime
 from tkinter import font as tkfont
 from syntax_highlighter import EnhancedScriptEditor
-from localization import _, save_language_setting
+from localization import _, save_language_setting, save_setting
 import configparser
 from custom_dialogs import askopenfilename, asksaveasfilename
 
@@ -349,6 +349,22 @@ class BashScriptMaker:
         self.current_script = ""
         self.script_name = "mein_script.sh"
 
+        # Schwellwerte für den Großdatei-Modus (in config.ini anpassbar)
+        config = configparser.ConfigParser()
+        config.read("config.ini")
+        self.large_file_size = (
+            config.getint("Settings", "large_file_size_kb", fallback=1024) * 1024
+        )
+        self.large_file_lines = config.getint(
+            "Settings", "large_file_lines", fallback=20000
+        )
+        # Vervollständigung beim Tippen (Menü Einstellungen)
+        self.as_you_type_var = tk.BooleanVar(
+            value=config.getboolean(
+                "Settings", "autocomplete_as_you_type", fallback=False
+            )
+        )
+
         # GUI erstellen
         self.create_menu()
         main_container = self.create_main_interface()
@@ -680,6 +696,12 @@ class BashScriptMaker:
             command=lambda: self.text_editor.event_generate("<<Paste>>"),
             accelerator="Ctrl+V",
         )
+        edit_menu.add_separator()
+        edit_menu.add_command(
+            label=_("Einrückung korrigieren"),
+            command=lambda: self.text_editor.reindent(),
+            accelerator="Ctrl+Shift+I",
+        )
 
         # Skript-Menü
         script_menu = tk.Menu(menubar, tearoff=0)
@@ -694,6 +716,9 @@ class BashScriptMaker:
         script_menu.add_command(
             label=_("Skript-Info anzeigen"), command=self.show_script_info
         )
+        script_menu.add_command(
+            label=_("Großdatei-Modus umschalten"), command=self.toggle_large_file_mode
+        )
 
         # Einstellungen-Menü
         settings_menu = tk.Menu(menubar, tearoff=0)
@@ -701,6 +726,11 @@ class BashScriptMaker:
         settings_menu.add_command(
             label=_("Schriftart anpassen..."), command=self.open_font_dialog
         )
+        settings_menu.add_checkbutton(
+            label=_("Vervollständigung beim Tippen"),
+            variable=self.as_you_type_var,
+            command=self.toggle_as_you_type,
+        )
         # --- Sprachauswahl ---
         language_menu = tk.Menu(settings_menu, tearoff=0)
         settings_menu.add_cascade(label=_("Sprache"), menu=language_menu)
@@ -734,15 +764,33 @@ class BashScriptMaker:
         # Statusleiste ganz unten platzieren
         self.status_var = tk.StringVar()
         self.status_var.set(_("Bereit"))
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
         status_bar = ttk.Label(
-            self.root,
+            status_frame,
             textvariable=self.status_var,
             relief=tk.SUNKEN,
             anchor=tk.W,
             bootstyle="inverse-dark",
             padding=5,
         )
-        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        # Hinweis auf den Großdatei-Modus, nur sichtbar solange er aktiv ist
+        self.large_file_indicator = ttk.Label(
+            status_frame,
+            text=_("Große Datei: reduzierte Hervorhebung"),
+            bootstyle="inverse-warning",
+            padding=5,
+            cursor="hand2",
+        )
+        self.large_file_indicator.bind(
+            "<Button-1>", lambda e: self.set_large_file_mode(False)
+        )
+        ToolTip(
+            self.large_file_indicator,
+            text=_("Klicken, um für diese Datei die volle Hervorhebung zu aktivieren"),
+        )
 
         # Header-Bereich für App-Titel und Logo
         self.create_header()
@@ -925,6 +973,7 @@ class BashScriptMaker:
             right_frame, wrap=tk.WORD, autohide=True, vbar=True, hbar=True
         )
         self.text_editor.pack(fill=tk.BOTH, expand=True)
+        self.text_editor.autocomplete.set_as_you_type(self.as_you_type_var.get())
 
         # Support-Bereich unter dem Editor
         self.create_support_area(editor_container)
@@ -979,6 +1028,24 @@ class BashScriptMaker:
         self.text_editor.delete(1.0, tk.END)
         self.text_editor.insert(1.0, content)
 
+    def is_large_file(self, file_path, content):
+        """Prüft, ob eine Datei die Schwellwerte für den Großdatei-Modus überschreitet"""
+        if os.path.getsize(file_path) > self.large_file_size:
+            return True
+        return content.count("\n") + 1 > self.large_file_lines
+
+    def set_large_file_mode(self, enabled):
+        """Schaltet den Großdatei-Modus für die aktuelle Datei ein oder aus"""
+        self.text_editor.set_large_file_mode(enabled)
+        if enabled:
+            self.large_file_indicator.pack(side=tk.RIGHT)
+        else:
+            self.large_file_indicator.pack_forget()
+
+    def toggle_large_file_mode(self):
+        """Schaltet den Großdatei-Modus der aktuellen Datei um"""
+        self.set_large_file_mode(not self.text_editor.large_file_mode)
+
     def update_script_name(self, event=None):
         """Aktualisiert den Script-Namen"""
         self.script_name = self.name_entry.get()
@@ -994,6 +1061,7 @@ class BashScriptMaker:
             self.script_name = "mein_script.sh"
             self.name_entry.delete(0, tk.END)
             self.name_entry.insert(0, self.script_name)
+            self.text_editor.autocomplete.script_path = None
             self.update_script_content(
                 "#!/bin/bash\n# "
                 + _("Erstellt mit Bash-Script-Maker")
@@ -1001,6 +1069,8 @@ class BashScriptMaker:
                 + datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 + "\n\n"
             )
+            # Erst nach dem Ersetzen, sonst wird der alte Inhalt neu gefärbt
+            self.set_large_file_mode(False)
             self.status_var.set(_("Neues Script erstellt"))
 
     def open_script(self):
@@ -1016,7 +1086,17 @@ class BashScriptMaker:
             try:
                 with open(file_path, "r", encoding="utf-8") as file:
                     content = file.read()
+                # Einschalten vor dem Einfügen, damit kein voller Durchlauf
+                # startet; Ausschalten erst danach, damit nicht noch der alte
+                # Inhalt neu gefärbt wird
+                large_file = self.is_large_file(file_path, content)
+                if large_file:
+                    self.set_large_file_mode(True)
+                # source-Ziele im Script gelten relativ zu dessen Verzeichnis
+                self.text_editor.autocomplete.script_path = file_path
                 self.update_script_content(content)
+                if not large_file:
+                    self.set_large_file_mode(False)
                 self.script_name = os.path.basename(file_path)
                 self.name_entry.delete(0, tk.END)
                 self.name_entry.insert(0, self.script_name)
@@ -1035,6 +1115,7 @@ class BashScriptMaker:
             content = self.text_editor.get(1.0, tk.END).strip()
             with open(file_path, "w", encoding="utf-8") as file:
                 file.write(content)
+            self.text_editor.autocomplete.script_path = file_path
             self.status_var.set(_("Script gespeichert: {}").format(file_path))
         except Exception as e:
             messagebox.showerror(
@@ -1057,6 +1138,7 @@ class BashScriptMaker:
                 content = self.text_editor.get(1.0, tk.END).strip()
                 with open(file_path, "w", encoding="utf-8") as file:
                     file.write(content)
+                self.text_editor.autocomplete.script_path = file_path
                 self.script_name = os.path.basename(file_path)
                 self.name_entry.delete(0, tk.END)
                 self.name_entry.insert(0, self.script_name)
@@ -1175,6 +1257,12 @@ class BashScriptMaker:
         """Öffnet den Dialog zur Schriftart-Anpassung."""
         FontSettingsDialog(self.root, self.text_editor)
 
+    def toggle_as_you_type(self):
+        """Schaltet die Vervollständigung beim Tippen um und speichert die Wahl."""
+        enabled = self.as_you_type_var.get()
+        self.text_editor.autocomplete.set_as_you_type(enabled)
+        save_setting("autocomplete_as_you_type", str(enabled).lower())
+
     def change_language(self, language_code):
         """Speichert die ausgewählte Sprache und fordert zum Neustart auf."""
         save_language_setting(language_code)
@@ -36,9 +36,18 @@ def get_translator():
 _ = get_translator()
 
 
-def save_language_setting(language_code):
-    """Speichert die ausgewählte Sprache in der Konfigurationsdatei."""
+def save_setting(option, value):
+    """Speichert eine Einstellung in der Konfigurationsdatei."""
     config = configparser.ConfigParser()
-    config["Settings"] = {"language": language_code}
+    config.read("config.ini")
+    # Übrige Einstellungen (z.B. Großdatei-Schwellwerte) beibehalten
+    if not config.has_section("Settings"):
+        config.add_section("Settings")
+    config.set("Settings", option, str(value))
     with open("config.ini", "w") as configfile:
         config.write(configfile)
+
+
+def save_language_setting(language_code):
+    """Speichert die ausgewählte Sprache in der Konfigurationsdatei."""
+    save_setting("language", language_code)
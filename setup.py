@@ -51,7 +51,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/securebitsorg/bash-script-maker",
     packages=[],
-    py_modules=["bash_script_maker", "syntax_highlighter", "localization", "custom_dialogs", "assets"],
+    py_modules=["bash_script_maker", "syntax_highlighter", "bash_lexer", "bash_completion", "localization", "custom_dialogs", "assets"],
     include_package_data=True,
     install_requires=REQUIREMENTS,
     extras_require={
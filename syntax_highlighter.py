@@ -6,24 +6,89 @@ Syntax-Highlighter für Bash-Scripts
 
 import tkinter as tk
 from tkinter import scrolledtext, Listbox, Toplevel
+from tkinter import font as tkfont
 import ttkbootstrap as ttk
 from ttkbootstrap.scrolled import ScrolledText
-import re
 import os
 import glob
+import re
+import queue
+import threading
+import time
+
+from bash_completion import (
+    DirectoryCache,
+    ExecutableIndex,
+    FuzzyIndex,
+    OptionIndex,
+    PrefixIndex,
+    SourceIndex,
+    SymbolIndex,
+)
+from bash_lexer import (
+    INDENT_CLOSERS,
+    INDENT_MIDDLES,
+    INITIAL_STATE,
+    PATTERNS,
+    BashLexer,
+    BlockPairIndex,
+    IndentEngine,
+    pair_events,
+    reindent_lines,
+)
 
 
 class BashAutocomplete:
     """Autovervollständigung für Bash-Scripts"""
 
+    # Zeichen, die außer Buchstaben und Ziffern zu einem Wort gehören
+    WORD_CHARS = "_-$/.~"
+
+    # Wörter vor dem eigentlichen Befehl, deren Optionen vervollständigt werden
+    PRECOMMAND_WORDS = frozenset(
+        {
+            "sudo",
+            "time",
+            "nohup",
+            "env",
+            "exec",
+            "command",
+            "builtin",
+            "then",
+            "do",
+            "else",
+            "!",
+        }
+    )
+
     def __init__(self, text_widget):
         self.text_widget = text_widget
+        # Das Vorschlagsfenster wird einmal erzeugt und danach nur ein- und
+        # ausgeblendet; die Listbox zeigt jeweils eine Seite von page_size
+        # Zeilen aus current_suggestions (virtuelle Liste)
         self.suggestions_window = None
         self.suggestions_listbox = None
+        self.suggestions_scrollbar = None
+        self.popup_visible = False
+        self.page_size = 10
         self.current_suggestions = []
+        self._selected_index = 0
+        self._top_index = 0
+        self._loading = False
         self.current_word_start = None
         self.current_word_end = None
 
+        # Variablen aus dem Text sammeln (im Großdatei-Modus abgeschaltet)
+        self.scan_variables = True
+        # Variablen und Funktionen des Scripts; ohne Änderungsmeldungen
+        # (siehe track_edits) wird der Text bei jeder Abfrage neu eingelesen
+        self.symbols = SymbolIndex()
+        self._edits_tracked = False
+        # Per source eingebundene Dateien; relative Ziele gelten zum
+        # Verzeichnis von script_path (ohne Pfad: Arbeitsverzeichnis)
+        self.script_path = None
+        self.source_index = SourceIndex()
+
         # Bash-Befehle und Schlüsselwörter
         self.bash_commands = {
             # Grundlegende Befehle
@@ -222,6 +287,46 @@ class BashAutocomplete:
             "true",
         }
 
+        # Befehle und Schlüsselwörter als sortierter Index für Präfixabfragen
+        self.word_index = PrefixIndex(self.bash_commands | self.bash_keywords)
+        # und als Trigramm-Index für die unscharfe Suche
+        self.fuzzy_index = FuzzyIndex(self.word_index)
+        self.max_fuzzy_suggestions = 50
+        # Variablen ebenso, siehe get_variable_suggestions
+        self.variable_index = PrefixIndex()
+        self.variable_fuzzy_index = FuzzyIndex()
+
+        # Programme aus $PATH, siehe load_path_commands
+        self.path_index = ExecutableIndex()
+        self.path_poll_ms = 50
+
+        # Verzeichnisinhalte für die Pfadvervollständigung; nicht
+        # zwischengespeicherte Verzeichnisse werden im Hintergrund gelesen
+        self.directory_cache = DirectoryCache()
+        self._path_listing = None  # threading.Event des laufenden Einlesens
+        self.loading_text = "Lade Verzeichnis …"
+
+        # Optionen installierter Befehle, beim ersten Bedarf im Hintergrund
+        # eingelesen (siehe get_option_suggestions)
+        self.option_index = OptionIndex()
+        self.option_poll_ms = 100
+        self._option_job = None
+        self._option_word = None
+
+        # Vervollständigung beim Tippen (siehe set_as_you_type)
+        self.as_you_type = False
+        self.as_you_type_delay_ms = 150
+        self.as_you_type_min_chars = 2
+        self._as_you_type_job = None
+        self._selection_moved = False
+        # Wort und Vorschläge der letzten Abfrage; beim Weitertippen desselben
+        # Wortes wird diese Liste eingegrenzt statt neu abgefragt
+        self._query_word = None
+        self._query_results = None
+        # Anfang des abgefragten Wortes ("zeile.spalte"); anderswo gilt die
+        # Abfrage nicht, z.B. "-l" hinter grep statt hinter ls
+        self._query_start = None
+
         # Häufige Optionen für Befehle
         self.command_options = {
             "ls": ["-l", "-a", "-h", "-la", "-lh", "-1", "-R", "-t", "-S", "-X"],
@@ -261,6 +366,144 @@ class BashAutocomplete:
         # Escape zum Schließen der Vorschlagsliste
         self.text_widget.bind("<Escape>", self.hide_suggestions)
 
+        # Beim Tippen bleibt der Fokus im Editor; die Tasten für die Liste
+        # laufen über ein eigenes Bindtag vor den Bindungen des Editors
+        tag = f"BashAutocomplete{id(self)}"
+        self.text_widget.bind_class(tag, "<KeyRelease>", self._on_key_release)
+        self.text_widget.bind_class(tag, "<Down>", lambda e: self._on_popup_key(1))
+        self.text_widget.bind_class(tag, "<Up>", lambda e: self._on_popup_key(-1))
+        self.text_widget.bind_class(tag, "<Tab>", self._on_popup_accept)
+        self.text_widget.bind_class(tag, "<Return>", self._on_popup_accept)
+        self.text_widget.bindtags((tag,) + tuple(self.text_widget.bindtags()))
+
+    def set_as_you_type(self, enabled):
+        """Schaltet die Vervollständigung beim Tippen ein oder aus"""
+        self.as_you_type = enabled
+        if not enabled:
+            if self._as_you_type_job is not None:
+                self.text_widget.after_cancel(self._as_you_type_job)
+                self._as_you_type_job = None
+            self.hide_suggestions()
+
+    def _on_key_release(self, event):
+        """Plant beim Tippen eines Wortes die Aktualisierung der Vorschläge"""
+        if not self.as_you_type:
+            return None
+        char = event.char
+        if event.keysym == "BackSpace" or (
+            char and (char.isalnum() or char in self.WORD_CHARS)
+        ):
+            if self._as_you_type_job is not None:
+                self.text_widget.after_cancel(self._as_you_type_job)
+            self._as_you_type_job = self.text_widget.after(
+                self.as_you_type_delay_ms, self.update_suggestions
+            )
+        elif (char and char.isprintable()) or event.keysym in (
+            "Left",
+            "Right",
+            "Home",
+            "End",
+            "Prior",
+            "Next",
+        ):
+            # Wortende oder Cursor verlassen das Wort
+            self.hide_suggestions()
+        return None
+
+    def _on_popup_key(self, direction):
+        """Pfeiltasten im Editor bewegen die Auswahl einer offenen Liste"""
+        if not self.popup_visible:
+            return None
+        return self.navigate_suggestions(direction)
+
+    def _on_popup_accept(self, event):
+        """Tab übernimmt den Vorschlag; Return nur, wenn die Auswahl bewegt wurde"""
+        # Shift-/Strg-Tab bleiben dem Editor (Ausrücken, Vervollständigen)
+        if not self.popup_visible or event.state & 0x5:
+            return None
+        if event.keysym == "Tab" or self._selection_moved:
+            return self.apply_suggestion()
+        self.hide_suggestions()
+        return None
+
+    def load_path_commands(self, on_loaded=None):
+        """Lädt die Programme aus $PATH in einem Hintergrund-Thread
+
+        Sobald sie vorliegen, werden sie im Tk-Mainloop in die Vorschläge
+        übernommen und an on_loaded(namen) übergeben.
+        """
+        results = queue.Queue()
+        threading.Thread(
+            target=self._load_path_commands_worker, args=(results,), daemon=True
+        ).start()
+        self.text_widget.after(
+            self.path_poll_ms, self._poll_path_commands, results, on_loaded
+        )
+
+    def _load_path_commands_worker(self, results):
+        """Liest $PATH ein (läuft im Hintergrund-Thread)"""
+        names = frozenset()
+        try:
+            names = self.path_index.load()
+        finally:
+            results.put(names)
+
+    def _poll_path_commands(self, results, on_loaded):
+        """Übernimmt das Ergebnis des Hintergrund-Threads, sobald es vorliegt"""
+        try:
+            names = results.get_nowait()
+        except queue.Empty:
+            self.text_widget.after(
+                self.path_poll_ms, self._poll_path_commands, results, on_loaded
+            )
+            return
+        self.add_commands(names)
+        if on_loaded is not None:
+            on_loaded(names)
+
+    def add_commands(self, names):
+        """Nimmt weitere Befehle in die Vorschläge auf"""
+        self.bash_commands.update(names)
+        self.word_index.update(names)
+        self.fuzzy_index.update(names)
+        self._query_word = self._query_results = None
+
+    def track_edits(self, highlighter):
+        """Hält den Symbol-Index über die Änderungsmeldungen des Highlighters aktuell"""
+        highlighter.edit_callbacks.append(self._on_text_edit)
+        self._edits_tracked = True
+
+    def _on_text_edit(self, first_line, line_delta):
+        """Hält den Symbol-Index aktuell und bricht das Einlesen eines Verzeichnisses ab"""
+        self.symbols.edit(first_line, line_delta)
+        self.cancel_path_listing()
+
+    def _read_lines(self, first_line, last_line):
+        """Liefert den Text der Zeilen first_line bis last_line (None = Textende)"""
+        if last_line is None:
+            # Ohne den Zeilenumbruch, den Tk am Textende immer anhängt
+            text = self.text_widget.get(f"{first_line}.0", tk.END)[:-1]
+        else:
+            text = self.text_widget.get(f"{first_line}.0", f"{last_line}.end")
+        return text.split("\n")
+
+    def refresh_symbols(self):
+        """Liest die seit der letzten Abfrage geänderten Zeilen in den Symbol-Index ein"""
+        if not self._edits_tracked:
+            self.symbols.dirty_lines = (1, None)
+        self.symbols.refresh(self._read_lines)
+
+    def get_sourced_symbols(self):
+        """Liefert (Variablen, Funktionen) der eingebundenen Dateien"""
+        self.refresh_symbols()
+        if not self.symbols.sources:
+            return set(), set()
+        if self.script_path:
+            base_dir = os.path.dirname(os.path.abspath(self.script_path))
+        else:
+            base_dir = os.getcwd()
+        return self.source_index.symbols(self.symbols.sources, base_dir)
+
     def get_current_word_bounds(self):
         """Ermittelt die Grenzen des aktuellen Wortes unter dem Cursor"""
         cursor_pos = self.text_widget.index(tk.INSERT)
@@ -270,22 +513,21 @@ class BashAutocomplete:
         line_content = self.text_widget.get(f"{line}.0", f"{line}.end")
 
         # Finde Wortgrenzen
-        word_start = col
-        word_end = col
+        word_start = word_end = int(col)
 
         # Gehe rückwärts zum Wortanfang
         while word_start > 0 and (
-            line_content[int(word_start) - 1].isalnum()
-            or line_content[int(word_start) - 1] in "_-$/"
+            line_content[word_start - 1].isalnum()
+            or line_content[word_start - 1] in self.WORD_CHARS
         ):
-            word_start = str(int(word_start) - 1)
+            word_start -= 1
 
         # Gehe vorwärts zum Wortende
-        while int(word_end) < len(line_content) and (
-            line_content[int(word_end)].isalnum()
-            or line_content[int(word_end)] in "_-$/"
+        while word_end < len(line_content) and (
+            line_content[word_end].isalnum()
+            or line_content[word_end] in self.WORD_CHARS
         ):
-            word_end = str(int(word_end) + 1)
+            word_end += 1
 
         return f"{line}.{word_start}", f"{line}.{word_end}"
 
@@ -304,40 +546,102 @@ class BashAutocomplete:
 
         # Prüfe Kontext
         if not partial_word:
-            # Am Zeilenanfang - zeige alle Befehle
-            suggestions.update(self.bash_commands)
-            suggestions.update(self.bash_keywords)
+            # Am Zeilenanfang - zeige alle Befehle (bereits sortiert)
+            return self.word_index.prefix("")
         elif partial_word.startswith("$"):
-            # Variablen
-            suggestions.update(self.get_variable_suggestions())
+            # Variablen mit passendem Anfang, sonst ähnliche
+            return self.get_variable_suggestions(partial_word)
         elif partial_word.startswith("/"):
             # Pfadvervollständigung
             suggestions.update(self.get_path_suggestions(partial_word))
-        elif partial_word.startswith("./") or partial_word.startswith("../"):
+        elif partial_word.startswith(("./", "../", "~/")):
             # Relativer Pfad
             suggestions.update(self.get_path_suggestions(partial_word))
+        elif partial_word.startswith("-"):
+            # Optionen des Befehls, zu dem das Wort gehört
+            command = self.command_at_cursor(line_content, int(col))
+            suggestions.update(
+                option
+                for option in self.get_option_suggestions(command, partial_word)
+                if option.startswith(partial_word)
+            )
         elif partial_word in self.command_options:
             # Optionen für bekannten Befehl
-            suggestions.update(self.command_options[partial_word])
+            suggestions.update(self.get_option_suggestions(partial_word, partial_word))
         else:
-            # Normale Befehle und Schlüsselwörter
-            # Filtere basierend auf Eingabe
-            for cmd in self.bash_commands:
-                if cmd.startswith(partial_word):
-                    suggestions.add(cmd)
-
-            for keyword in self.bash_keywords:
-                if keyword.startswith(partial_word):
-                    suggestions.add(keyword)
+            # Normale Befehle und Schlüsselwörter mit passendem Anfang,
+            # per Binärsuche und bereits sortiert
+            suggestions = self.word_index.prefix(partial_word)
+            functions = self.get_function_suggestions(partial_word)
+            if functions:
+                suggestions = sorted(set(suggestions) | functions)
 
             # Wenn keine direkten Übereinstimmungen, zeige ähnliche
-            if not suggestions:
-                suggestions.update(self.get_similar_suggestions(partial_word))
+            return suggestions or self.get_similar_suggestions(partial_word)
+
+        return sorted(suggestions)
+
+    def command_at_cursor(self, line_content, col):
+        """Liefert den Befehl, zu dem die Position col der Zeile gehört"""
+        segment = re.split(r"[|;&(`]", line_content[:col])[-1]
+        for word in segment.split():
+            if "=" not in word and word not in self.PRECOMMAND_WORDS:
+                return word
+        return None
+
+    def get_option_suggestions(self, command, partial_word=None):
+        """Liefert die bekannten Optionen eines Befehls
+
+        Sind die Optionen eines installierten Befehls noch nicht eingelesen,
+        wird das im Hintergrund angestoßen; die Liste wird danach
+        aktualisiert, sofern das Wort unter dem Cursor noch partial_word ist.
+        """
+        options = set(self.command_options.get(command, ()))
+        indexed = self.option_index.options(command)
+        if indexed is not None:
+            options.update(indexed)
+        elif self.option_index.request(command):
+            self._option_word = partial_word
+            if self._option_job is None:
+                self._option_job = self.text_widget.after(
+                    self.option_poll_ms, self._poll_option_index
+                )
+        return options
+
+    def _poll_option_index(self):
+        """Übernimmt im Hintergrund eingelesene Optionen"""
+        self._option_job = None
+        finished = False
+        while True:
+            try:
+                self.option_index.indexed.get_nowait()
+            except queue.Empty:
+                break
+            finished = True
+
+        if finished:
+            # Frühere Abfragen kannten die neuen Optionen noch nicht
+            self._query_word = self._query_results = None
+            # Nur eine noch offene Liste zum selben Wort wird aktualisiert
+            option_word = self._option_word
+            self._option_word = None
+            if (
+                self.popup_visible
+                and option_word
+                and option_word == self.get_current_word()
+            ):
+                self.update_suggestions(min_chars=1, focus=not self.as_you_type)
+        if self.option_index.pending:
+            self._option_job = self.text_widget.after(
+                self.option_poll_ms, self._poll_option_index
+            )
 
-        return sorted(list(suggestions))
+    def get_variable_suggestions(self, partial_word="$"):
+        """Liefert die Variablen mit dem Anfang partial_word, sortiert
 
-    def get_variable_suggestions(self):
-        """Sammelt alle Variablen aus dem Script"""
+        Wie bei den Befehlen per Präfix-Index; ohne Treffer werden ähnliche
+        Variablen gesucht, die besten zuerst.
+        """
         variables = set()
 
         # Häufige Bash-Variablen
@@ -358,66 +662,152 @@ class BashAutocomplete:
             ]
         )
 
-        # Extrahiere benutzerdefinierte Variablen aus dem Text
-        text_content = self.text_widget.get("1.0", tk.END)
-        var_pattern = r"\b([A-Za-z_][A-Za-z0-9_]*)\s*="
-        for match in re.finditer(var_pattern, text_content):
-            var_name = match.group(1)
-            variables.add(f"${var_name}")
+        # Benutzerdefinierte Variablen aus dem Symbol-Index
+        if self.scan_variables:
+            self.refresh_symbols()
+            variables.update(f"${name}" for name in self.symbols.variables)
+            variables.update(f"${name}" for name in self.get_sourced_symbols()[0])
+
+        # Indizes nur um die Änderungen seit der letzten Abfrage nachziehen
+        known = set(self.variable_index)
+        for name in known - variables:
+            self.variable_index.discard(name)
+            self.variable_fuzzy_index.discard(name)
+        added = variables - known
+        self.variable_index.update(added)
+        self.variable_fuzzy_index.update(added)
+
+        matches = self.variable_index.prefix(partial_word)
+        if matches:
+            return matches
+        return self.variable_fuzzy_index.search(
+            partial_word, self.max_fuzzy_suggestions
+        )
 
-        return variables
+    def get_function_suggestions(self, partial_word):
+        """Liefert die im Script definierten Funktionen mit passendem Anfang"""
+        if not self.scan_variables:
+            return set()
+        self.refresh_symbols()
+        functions = set(self.symbols.functions)
+        functions.update(self.get_sourced_symbols()[1])
+        return {name for name in functions if name.startswith(partial_word)}
 
     def get_path_suggestions(self, partial_path):
         """Generiert Pfadvorschläge"""
-        suggestions = set()
-
         try:
-            # Expandiere ~ zu Home-Verzeichnis
-            expanded_path = os.path.expanduser(partial_path)
+            base_dir, prefix, shown_dir = self._split_path(partial_path)
+            # Liste Dateien/Verzeichnisse auf (aus dem Verzeichnis-Cache)
+            entries = self.directory_cache.complete(base_dir, prefix)
+        except (OSError, ValueError):
+            return set()
+        return set(self._format_paths(entries, shown_dir))
+
+    @staticmethod
+    def is_path_word(partial_word):
+        """Prüft, ob das Wort als Pfad vervollständigt wird"""
+        return partial_word.startswith(("/", "./", "../", "~/"))
+
+    @staticmethod
+    def _split_path(partial_path):
+        """Zerlegt einen Pfad in (Verzeichnis, Präfix, angezeigtes Verzeichnis)
+
+        "/usr/" listet /usr, "/usr" die Einträge von / mit dem Anfang "usr".
+        """
+        # Expandiere ~ zu Home-Verzeichnis
+        expanded_path = os.path.expanduser(partial_path)
+        base_dir = os.path.dirname(expanded_path) or "."
+        prefix = os.path.basename(expanded_path)
+        return base_dir, prefix, os.path.dirname(partial_path)
+
+    @staticmethod
+    def _format_paths(entries, shown_dir):
+        """Wandelt (Name, ist_Verzeichnis) in Vorschläge um; Verzeichnisse enden auf /"""
+        paths = []
+        for item, is_dir in entries:
+            path = os.path.join(shown_dir, item)
+            paths.append(path + "/" if is_dir else path)
+        return paths
+
+    def start_path_listing(self, partial_path):
+        """Liest das Verzeichnis von partial_path in einem Hintergrund-Thread
+
+        Die Vorschlagsliste zeigt bis zum Ende eine Ladezeile; Treffer werden
+        ergänzt, sobald sie gelesen sind. cancel_path_listing() bricht ab.
+        """
+        self.cancel_path_listing()
+        base_dir, prefix, shown_dir = self._split_path(partial_path)
+        cancelled = threading.Event()
+        results = queue.Queue()
+        self._path_listing = cancelled
+        threading.Thread(
+            target=self._path_listing_worker,
+            args=(base_dir, cancelled, results),
+            daemon=True,
+        ).start()
+        self.text_widget.after(
+            self.path_poll_ms,
+            self._poll_path_listing,
+            cancelled,
+            results,
+            prefix,
+            shown_dir,
+        )
 
-            # Finde das Verzeichnis und den Präfix
-            if os.path.isdir(expanded_path):
-                base_dir = expanded_path
-                prefix = ""
-            else:
-                base_dir = os.path.dirname(expanded_path) or "."
-                prefix = os.path.basename(expanded_path)
-
-            # Liste Dateien/Verzeichnisse auf
-            if os.path.exists(base_dir):
-                for item in os.listdir(base_dir):
-                    if item.startswith(prefix):
-                        full_path = os.path.join(base_dir, item)
-                        if os.path.isdir(full_path):
-                            suggestions.add(
-                                os.path.join(os.path.dirname(partial_path), item) + "/"
-                            )
-                        else:
-                            suggestions.add(
-                                os.path.join(os.path.dirname(partial_path), item)
-                            )
+    def cancel_path_listing(self):
+        """Bricht das Einlesen eines Verzeichnisses ab"""
+        if self._path_listing is not None:
+            self._path_listing.set()
+            self._path_listing = None
 
+    def _path_listing_worker(self, base_dir, cancelled, results):
+        """Liest ein Verzeichnis (läuft im Hintergrund-Thread)"""
+        entries = []
+        try:
+            entries = self.directory_cache.listing(
+                base_dir, cancelled, lambda batch: results.put(("batch", batch))
+            )
         except (OSError, ValueError):
             pass
+        finally:
+            results.put(("done", entries))
 
-        return suggestions
+    def _poll_path_listing(self, cancelled, results, prefix, shown_dir):
+        """Übernimmt Teilergebnisse des Hintergrund-Threads in die Vorschlagsliste"""
+        if cancelled.is_set():
+            return
+        new_suggestions = []
+        while True:
+            try:
+                kind, entries = results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "done":
+                self._path_listing = None
+                matches = DirectoryCache.prefix_matches(entries or [], prefix)
+                self.set_suggestions(self._format_paths(matches, shown_dir))
+                return
+            matches = sorted(entry for entry in entries if entry[0].startswith(prefix))
+            new_suggestions.extend(self._format_paths(matches, shown_dir))
+
+        if new_suggestions:
+            self.set_suggestions(self.current_suggestions + new_suggestions, True)
+        self.text_widget.after(
+            self.path_poll_ms,
+            self._poll_path_listing,
+            cancelled,
+            results,
+            prefix,
+            shown_dir,
+        )
 
     def get_similar_suggestions(self, partial_word):
-        """Findet ähnliche Befehle/Schlüsselwörter"""
-        suggestions = set()
-        partial_lower = partial_word.lower()
-
-        # Fuzzy-Matching für Befehle
-        for cmd in self.bash_commands:
-            if partial_lower in cmd.lower():
-                suggestions.add(cmd)
-
-        # Fuzzy-Matching für Schlüsselwörter
-        for keyword in self.bash_keywords:
-            if partial_lower in keyword.lower():
-                suggestions.add(keyword)
+        """Findet ähnliche Befehle/Schlüsselwörter, die besten Treffer zuerst
 
-        return suggestions
+        Berücksichtigt Teilfolgen (z.B. "gco" für "gcov") und Tippfehler
+        (z.B. "gerp" für "grep").
+        """
+        return self.fuzzy_index.search(partial_word, self.max_fuzzy_suggestions)
 
     def show_suggestions(self, event=None):
         """Zeigt Vorschlagsliste an"""
@@ -431,16 +821,109 @@ class BashAutocomplete:
         line_content = self.text_widget.get(f"{line_num}.0", f"{line_num}.end")
 
         # Generiere Vorschläge
-        suggestions = self.get_context_aware_suggestions(
+        suggestions, loading = self.query_suggestions(
             current_word, line_content, cursor_pos
         )
 
-        if not suggestions:
+        if not suggestions and not loading:
             return "break"
 
         # Erstelle Vorschlagsfenster
         self.current_word_start, self.current_word_end = self.get_current_word_bounds()
-        self.current_suggestions = suggestions
+        self.open_suggestions_window(suggestions, loading)
+        if loading:
+            self.start_path_listing(current_word)
+        return "break"
+
+    def update_suggestions(self, min_chars=None, focus=False):
+        """Aktualisiert die Liste beim Tippen, ohne dem Editor den Fokus zu nehmen"""
+        self._as_you_type_job = None
+        if min_chars is None:
+            min_chars = self.as_you_type_min_chars
+        current_word = self.get_current_word()
+        if len(current_word) < min_chars:
+            self.hide_suggestions()
+            return
+
+        loading = False
+        suggestions = self.narrow_suggestions(current_word)
+        if suggestions is None:
+            cursor_pos = self.text_widget.index(tk.INSERT)
+            line_num = cursor_pos.split(".")[0]
+            line_content = self.text_widget.get(f"{line_num}.0", f"{line_num}.end")
+            suggestions, loading = self.query_suggestions(
+                current_word, line_content, cursor_pos
+            )
+        if not suggestions and not loading:
+            self.hide_suggestions()
+            return
+
+        self.current_word_start, self.current_word_end = self.get_current_word_bounds()
+        if not self.popup_visible:
+            self.open_suggestions_window(suggestions, loading, focus=focus)
+        else:
+            self.set_suggestions(suggestions, loading)
+        if loading:
+            self.start_path_listing(current_word)
+
+    def query_suggestions(self, partial_word, line_content, cursor_pos):
+        """Fragt alle Quellen ab und liefert (Vorschläge, lädt_noch)
+
+        Nicht zwischengespeicherte Verzeichnisse werden im Hintergrund
+        gelesen (siehe start_path_listing); bis dahin ist die Liste leer.
+        """
+        loading = False
+        if self.is_path_word(partial_word):
+            base_dir = self._split_path(partial_word)[0]
+            loading = self.directory_cache.peek(base_dir) is None
+
+        if loading:
+            suggestions = []
+        else:
+            suggestions = self.get_context_aware_suggestions(
+                partial_word, line_content, cursor_pos
+            )
+
+        # Eingrenzen lässt sich nur eine vollständige Präfix-Abfrage
+        self._query_word = self._query_results = None
+        if suggestions and all(s.startswith(partial_word) for s in suggestions):
+            self._query_word = partial_word
+            self._query_results = suggestions
+            self._query_start = self.get_current_word_bounds()[0]
+        return suggestions, loading
+
+    def narrow_suggestions(self, partial_word):
+        """Grenzt die Vorschläge der letzten Abfrage auf partial_word ein
+
+        Gibt None zurück, wenn neu abgefragt werden muss: das Wort setzt die
+        letzte Abfrage nicht fort, beginnt an anderer Stelle, wechselt das
+        Verzeichnis oder es bleibt kein Vorschlag übrig.
+        """
+        query_word = self._query_word
+        if query_word is None or not partial_word.startswith(query_word):
+            return None
+        if self.get_current_word_bounds()[0] != self._query_start:
+            self._query_word = self._query_results = None
+            return None
+        if "/" in partial_word[len(query_word) :]:
+            return None
+        narrowed = [s for s in self._query_results if s.startswith(partial_word)]
+        return narrowed or None
+
+    def open_suggestions_window(self, suggestions, loading=False, focus=True):
+        """Zeigt die Vorschlagsliste unter dem aktuellen Wort
+
+        Das Fenster wird nur beim ersten Mal erzeugt und danach lediglich
+        verschoben und wieder eingeblendet. Mit focus=False bleibt der Fokus
+        im Editor (Vervollständigung beim Tippen).
+        """
+        self._create_suggestions_window()
+        self._selection_moved = False
+        self._selected_index = 0
+        self._top_index = 0
+        self.current_suggestions = list(suggestions)
+        self._loading = loading
+        self._render_suggestions()
 
         # Position für Vorschlagsfenster berechnen
         bbox = self.text_widget.bbox(self.current_word_end)
@@ -453,94 +936,201 @@ class BashAutocomplete:
             x = self.text_widget.winfo_rootx() + 50
             y = self.text_widget.winfo_rooty() + 100
 
+        self.suggestions_window.wm_geometry(f"+{x}+{y}")
+        self.suggestions_window.deiconify()
+        self.suggestions_window.lift()
+        self.popup_visible = True
+
+        # Fokussiere Listbox
+        if focus:
+            self.suggestions_listbox.focus_set()
+
+    def _create_suggestions_window(self):
+        """Erzeugt das (zunächst versteckte) Vorschlagsfenster einmalig"""
+        if (
+            self.suggestions_window is not None
+            and self.suggestions_window.winfo_exists()
+        ):
+            return
+
         # Erstelle Toplevel-Fenster
         self.suggestions_window = Toplevel(self.text_widget)
         self.suggestions_window.wm_overrideredirect(True)
-        self.suggestions_window.wm_geometry(f"+{x}+{y}")
+        self.suggestions_window.withdraw()
 
-        # Erstelle Listbox
+        # Die Listbox zeigt nur die sichtbare Seite, die Bildlaufleiste
+        # bildet die Position in der gesamten Liste ab
         self.suggestions_listbox = Listbox(
             self.suggestions_window,
-            height=min(len(suggestions), 10),
+            height=self.page_size,
             width=30,
             font=("Courier", 10),
+            exportselection=False,
+        )
+        self.suggestions_scrollbar = tk.Scrollbar(
+            self.suggestions_window, command=self._on_scrollbar
         )
+        self.suggestions_listbox.pack(side=tk.LEFT)
 
-        # Füge Vorschläge hinzu
-        for suggestion in suggestions:
-            self.suggestions_listbox.insert(tk.END, suggestion)
+        # Event-Bindings für Listbox
+        listbox = self.suggestions_listbox
+        listbox.bind("<Return>", self.apply_suggestion)
+        listbox.bind("<Tab>", self.apply_suggestion)
+        listbox.bind("<Escape>", self.hide_suggestions)
+        listbox.bind("<Up>", lambda e: self.navigate_suggestions(-1))
+        listbox.bind("<Down>", lambda e: self.navigate_suggestions(1))
+        listbox.bind("<Prior>", lambda e: self.navigate_suggestions(-self.page_size))
+        listbox.bind("<Next>", lambda e: self.navigate_suggestions(self.page_size))
+        listbox.bind("<Button-1>", self.on_listbox_click)
+        listbox.bind("<MouseWheel>", self._on_mouse_wheel)
+        listbox.bind("<Button-4>", lambda e: self.scroll_suggestions(-3))
+        listbox.bind("<Button-5>", lambda e: self.scroll_suggestions(3))
+        listbox.bind("<Key>", self.on_listbox_key)
+
+    def _row_count(self):
+        """Anzahl der Zeilen der gesamten Liste, einschließlich Ladezeile"""
+        return len(self.current_suggestions) + self._loading
+
+    def _render_suggestions(self):
+        """Füllt die Listbox mit der sichtbaren Seite der Vorschläge"""
+        listbox = self.suggestions_listbox
+        rows = self._row_count()
+        top = self._top_index
+        page = self.current_suggestions[top : top + self.page_size]
+        if self._loading and len(page) < self.page_size:
+            page.append(self.loading_text)
+
+        listbox.delete(0, tk.END)
+        listbox.insert(tk.END, *page)
+        listbox.configure(height=max(1, min(rows, self.page_size)))
+        if top <= self._selected_index < top + len(page):
+            listbox.selection_set(self._selected_index - top)
+            listbox.activate(self._selected_index - top)
+
+        if rows > self.page_size:
+            self.suggestions_scrollbar.set(top / rows, (top + len(page)) / rows)
+            self.suggestions_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        else:
+            self.suggestions_scrollbar.pack_forget()
 
-        self.suggestions_listbox.pack()
+    def set_suggestions(self, suggestions, loading=False):
+        """Ersetzt den Inhalt der offenen Vorschlagsliste
 
-        # Selektion des ersten Elements
-        if suggestions:
-            self.suggestions_listbox.selection_set(0)
-            self.suggestions_listbox.activate(0)
+        Die Auswahl bleibt auf dem gewählten Vorschlag. Ist die Liste nach
+        dem Laden leer, wird sie geschlossen.
+        """
+        if not self.popup_visible:
+            return
+        if not suggestions and not loading:
+            self.hide_suggestions()
+            return
 
-        # Event-Bindings für Listbox
-        self.suggestions_listbox.bind("<Return>", self.apply_suggestion)
-        self.suggestions_listbox.bind("<Tab>", self.apply_suggestion)
-        self.suggestions_listbox.bind("<Escape>", self.hide_suggestions)
-        self.suggestions_listbox.bind("<Up>", lambda e: self.navigate_suggestions(-1))
-        self.suggestions_listbox.bind("<Down>", lambda e: self.navigate_suggestions(1))
-        self.suggestions_listbox.bind("<Button-1>", self.on_listbox_click)
+        selected = None
+        if self._selected_index < len(self.current_suggestions):
+            selected = self.current_suggestions[self._selected_index]
+
+        self.current_suggestions = list(suggestions)
+        self._loading = loading
+        index = 0
+        if selected is not None and self._selection_moved:
+            try:
+                index = self.current_suggestions.index(selected)
+            except ValueError:
+                pass
+        self._select(index)
+
+    def _select(self, index):
+        """Wählt die Zeile index und blättert sie bei Bedarf in den sichtbaren Bereich"""
+        rows = self._row_count()
+        index = max(0, min(index, rows - 1))
+        self._selected_index = index
+        if index < self._top_index:
+            self._top_index = index
+        elif index >= self._top_index + self.page_size:
+            self._top_index = index - self.page_size + 1
+        self._top_index = max(0, min(self._top_index, rows - self.page_size))
+        self._render_suggestions()
+
+    def scroll_suggestions(self, rows):
+        """Blättert die sichtbare Seite um rows Zeilen, ohne die Auswahl zu ändern"""
+        if not self.popup_visible:
+            return "break"
+        last_top = max(0, self._row_count() - self.page_size)
+        self._top_index = max(0, min(self._top_index + rows, last_top))
+        self._render_suggestions()
+        return "break"
 
-        # Fokussiere Listbox
-        self.suggestions_listbox.focus_set()
+    def _on_mouse_wheel(self, event):
+        """Mausrad unter Windows und macOS"""
+        return self.scroll_suggestions(-3 if event.delta > 0 else 3)
 
-        return "break"
+    def _on_scrollbar(self, action, amount, unit=None):
+        """Übersetzt Befehle der Bildlaufleiste in Blättern der sichtbaren Seite"""
+        if action == "moveto":
+            rows = round(float(amount) * self._row_count()) - self._top_index
+        elif unit == "pages":
+            rows = int(amount) * self.page_size
+        else:
+            rows = int(amount)
+        self.scroll_suggestions(rows)
+
+    def on_listbox_key(self, event):
+        """Weiteres Tippen schließt die Liste und geht an den Editor"""
+        if event.char and event.char.isprintable():
+            self.hide_suggestions()
+            self.text_widget.insert(tk.INSERT, event.char)
+            return "break"
+        return None
 
     def navigate_suggestions(self, direction):
         """Navigiert in der Vorschlagsliste"""
-        if not self.suggestions_listbox:
-            return
-
-        current_selection = self.suggestions_listbox.curselection()
-        if not current_selection:
-            return
-
-        current_index = current_selection[0]
-        new_index = current_index + direction
-
-        if 0 <= new_index < self.suggestions_listbox.size():
-            self.suggestions_listbox.selection_clear(0, tk.END)
-            self.suggestions_listbox.selection_set(new_index)
-            self.suggestions_listbox.activate(new_index)
-            self.suggestions_listbox.see(new_index)
+        if not self.popup_visible:
+            return "break"
+        self._selection_moved = True
+        self._select(self._selected_index + direction)
+        return "break"
 
     def on_listbox_click(self, event):
         """Behandelt Klicks in der Listbox"""
-        if self.suggestions_listbox:
-            self.apply_suggestion()
+        if self.popup_visible:
+            row = self.suggestions_listbox.nearest(event.y)
+            self._selected_index = self._top_index + row
+            return self.apply_suggestion()
+        return "break"
 
     def apply_suggestion(self, event=None):
         """Wendet den ausgewählten Vorschlag an"""
-        if not self.suggestions_listbox:
-            return
+        if not self.popup_visible:
+            return "break"
 
-        selection = self.suggestions_listbox.curselection()
-        if selection:
-            selected_suggestion = self.suggestions_listbox.get(selection[0])
+        if self._selected_index >= len(self.current_suggestions):
+            # Die Ladezeile ist kein Vorschlag
+            return "break"
+        selected_suggestion = self.current_suggestions[self._selected_index]
 
-            # Ersetze das aktuelle Wort
-            self.text_widget.delete(self.current_word_start, self.current_word_end)
-            self.text_widget.insert(self.current_word_start, selected_suggestion)
+        # Ersetze das aktuelle Wort
+        self.text_widget.delete(self.current_word_start, self.current_word_end)
+        self.text_widget.insert(self.current_word_start, selected_suggestion)
 
-            # Setze Cursor an das Ende
-            self.text_widget.mark_set(
-                tk.INSERT, f"{self.current_word_start} + {len(selected_suggestion)}c"
-            )
+        # Setze Cursor an das Ende
+        self.text_widget.mark_set(
+            tk.INSERT, f"{self.current_word_start} + {len(selected_suggestion)}c"
+        )
 
         self.hide_suggestions()
         return "break"
 
     def hide_suggestions(self, event=None):
-        """Versteckt die Vorschlagsliste"""
-        if self.suggestions_window:
-            self.suggestions_window.destroy()
-            self.suggestions_window = None
-            self.suggestions_listbox = None
+        """Versteckt die Vorschlagsliste; das Fenster bleibt für die nächste erhalten"""
+        self.cancel_path_listing()
+        self._selection_moved = False
+        self._option_word = None  # nachgeladene Optionen öffnen die Liste nicht
+        self._query_word = self._query_results = None
+        if self.popup_visible:
+            self.suggestions_window.withdraw()
+            self.popup_visible = False
             self.current_suggestions = []
+            self._loading = False
 
         # Fokussiere zurück zum Text-Widget
         self.text_widget.focus_set()
@@ -551,29 +1141,251 @@ class BashAutocomplete:
 class BashSyntaxHighlighter:
     """Syntax-Highlighter für Bash-Scripts"""
 
-    def __init__(self, text_widget):
+    # Tcl-Proxy für das Text-Widget: meldet nach jedem insert/delete/replace
+    # die Startposition sowie die Zeilenzahl vor und nach der Änderung und
+    # nach jedem Scrollen (yview/see), dass sich der sichtbare Bereich geändert hat,
+    # sowie jede Bewegung des Cursors (mark set insert)
+    _EDIT_PROXY_SCRIPT = """
+rename {widget} {orig}
+proc {widget} {{command args}} {{
+    switch -exact -- $command {{
+        insert - delete - replace {{
+            set start [{orig} index [lindex $args 0]]
+            set lines_before [{orig} index end]
+            if {{$start eq $lines_before}} {{
+                # Änderungen "am Ende" betreffen die letzte echte Zeile
+                set start [{orig} index end-1c]
+            }}
+            set result [{orig} $command {{*}}$args]
+            {callback} $start $lines_before [{orig} index end]
+            return $result
+        }}
+        yview - see {{
+            set result [{orig} $command {{*}}$args]
+            {view_callback}
+            return $result
+        }}
+        mark {{
+            set result [{orig} $command {{*}}$args]
+            if {{[lindex $args 0] eq "set" && [lindex $args 1] eq "insert"}} {{
+                {cursor_callback}
+            }}
+            return $result
+        }}
+    }}
+    tailcall {orig} $command {{*}}$args
+}}
+"""
+
+    # Unsichtbarer Tag für Text, dessen Hervorhebung noch aussteht. Tk
+    # verschiebt ihn bei Änderungen selbst mit.
+    PENDING_TAG = "highlight_pending"
+
+    # Tag für das Klammer-/Blockpaar am Cursor
+    PAIR_TAG = "pair_match"
+
+    # Lexer-Zustand am Zeilenanfang (siehe bash_lexer)
+    INITIAL_STATE = INITIAL_STATE
+
+    # Wörter, die der Lexer als Befehl melden kann
+    WORD_PATTERN = re.compile(PATTERNS["commands"])
+
+    def __init__(
+        self,
+        text_widget,
+        incremental=True,
+        idle_delay_ms=40,
+        threaded=True,
+        thread_min_lines=5000,
+        fonts=None,
+    ):
         self.text_widget = text_widget
         self.highlighting_active = True
+        self.incremental = incremental
         self.tag_configs = {}  # Hält die Konfigurationen für die Tags
 
-        # Syntax-Muster für Bash
-        self.patterns = {
-            "comments": r"#.*$",  # Kommentare
-            "shebang": r"^#!/.*bash",  # Shebang
-            "strings": r'(["\'])(?:(?=(\\?))\2.)*?\1',  # Strings
-            "variables": r"\$[A-Za-z_][A-Za-z0-9_]*|\$\{[^}]+\}",  # Variablen
-            "commands": r"\b(?:echo|read|if|then|else|elif|fi|for|while|do|done|case|esac|function|return|exit|cd|ls|pwd|mkdir|rm|cp|mv|chmod|chown|grep|sed|awk|cat|head|tail|sort|uniq|wc|find|ps|kill|sudo|apt|yum|dnf|pacman)\b",  # Häufige Befehle
-            "operators": r"\b(?:-eq|-ne|-lt|-le|-gt|-ge|-f|-d|-e|-r|-w|-x|&&|\|\||==|!=|=~)\b",  # Operatoren
-            "numbers": r"\b\d+\b",  # Zahlen
-            "brackets": r"[(){}[\]]",  # Klammern
-        }
+        # Gemeinsame Font-Objekte (normal, bold, italic) für alle Tags. Tk
+        # übernimmt Änderungen an ihnen selbst, ohne die Tags neu zu setzen.
+        self.fonts = fonts if fonts is not None else self.create_fonts(text_widget)
+
+        # Geänderter Zeilenbereich (erste, letzte Zeile) seit dem letzten Durchlauf
+        self.dirty_lines = None
+
+        # Änderungszähler des Puffers; ein Durchlauf entfällt, wenn sich der
+        # Zähler seit dem letzten Durchlauf nicht verändert hat
+        self.revision = 0
+        self._highlighted_revision = 0
+
+        # Entprellung: Änderungen innerhalb von idle_delay_ms werden gesammelt
+        self.idle_delay_ms = idle_delay_ms
+        self._highlight_job = None
+        # Ausgesetzte Hervorhebung während Block-Änderungen (siehe suspend)
+        self._suspend_count = 0
+
+        # Hintergrund-Hervorhebung: Zeitbudget pro Schritt und Pause dazwischen
+        self.time_budget_ms = 8
+        self.chunk_lines = 200
+        self.background_delay_ms = 1
+        self._background_job = None
+        self._visible_job = None
+
+        # Großdatei-Modus: nur der sichtbare Bereich wird gefärbt
+        self.viewport_only = False
+
+        # Worker-Thread: stehen mindestens thread_min_lines Zeilen aus, wird
+        # ein Schnappschuss des Textes in einem Thread gelext. Die Ergebnisse
+        # landen in einer Queue, die der Tk-Mainloop per after() abholt.
+        # Jede Änderung erhöht den Generationszähler; Ergebnisse einer
+        # älteren Generation werden verworfen.
+        self.threaded = threaded
+        self.thread_min_lines = thread_min_lines
+        self.worker_poll_ms = 10
+        self._generation = 0
+        self._worker_generation = None
+        self._worker_results = queue.Queue()
+
+        # Tk-unabhängiger Lexer; der Highlighter setzt nur dessen Tokens als Tags
+        self.lexer = BashLexer()
+        # Token-Typen des Lexers entsprechen den Tag-Namen
+        self.patterns = self.lexer.patterns
+        # Wörter, die als Befehle & Schlüsselwörter hervorgehoben werden
+        self.command_words = self.lexer.command_words
+
+        # Zustand am Anfang jeder Zeile (Index 0 = Zeile 1), None = unbekannt
+        self.line_states = [self.INITIAL_STATE]
+        # Zuletzt gesetzte Tokens jeder Zeile, None = unbekannt
+        self.line_tokens = []
+        # Zusammengehörige Klammern und Blöcke, wird beim Lexen mitgepflegt
+        self.pairs = BlockPairIndex()
+        self._pair_job = None
+
+        # Weitere Empfänger der Änderungsmeldungen: callback(erste Zeile,
+        # Zeilendifferenz), z.B. der Symbol-Index der Autovervollständigung
+        self.edit_callbacks = []
+        # Empfänger der Meldung, dass sich der sichtbare Bereich geändert hat
+        # (Scrollen, Größenänderung), z.B. die Zeilennummern-Leiste
+        self.view_callbacks = []
 
         # Tag-Konfigurationen
         self.configure_tags()
 
-        # Event-Binding für Live-Highlighting
-        self.text_widget.bind("<KeyRelease>", self.highlight_syntax)
-        self.text_widget.bind("<ButtonRelease>", self.highlight_syntax)
+        # Änderungen direkt am Widget abfangen; ohne inkrementellen Modus wird
+        # nach jeder Änderung das gesamte Dokument neu gefärbt
+        self._install_edit_proxy()
+
+    def _install_edit_proxy(self):
+        """Leitet insert/delete/yview/see des Text-Widgets über einen Tcl-Proxy um"""
+        widget_path = str(self.text_widget)
+        callback = self.text_widget.register(self._on_text_edit)
+        view_callback = self.text_widget.register(self._on_view_change)
+        cursor_callback = self.text_widget.register(self._on_cursor_move)
+        self.text_widget.tk.eval(
+            self._EDIT_PROXY_SCRIPT.format(
+                widget=widget_path,
+                orig=widget_path + "_orig",
+                callback=callback,
+                view_callback=view_callback,
+                cursor_callback=cursor_callback,
+            )
+        )
+        self.text_widget.bind("<Configure>", self._on_view_change, add="+")
+
+    def _on_view_change(self, event=None):
+        """Zieht die Hervorhebung des neu sichtbaren Bereichs vor"""
+        for callback in self.view_callbacks:
+            callback()
+        if self._suspend_count:
+            return
+        if self._visible_job is None and self.highlighting_active:
+            self._visible_job = self.text_widget.after_idle(self._highlight_visible)
+
+    def _on_cursor_move(self):
+        """Plant die Hervorhebung des Paars am Cursor"""
+        if self._suspend_count:
+            return
+        if self._pair_job is None and self.highlighting_active:
+            self._pair_job = self.text_widget.after_idle(self.highlight_matching_pair)
+
+    def _on_text_edit(self, start, lines_before, lines_after):
+        """Merkt sich die von einer Änderung betroffenen Zeilen"""
+        first_line = int(start.split(".")[0])
+        line_delta = int(lines_after.split(".")[0]) - int(lines_before.split(".")[0])
+        self.mark_dirty(first_line, first_line + max(line_delta, 0), line_delta)
+        self.revision += 1
+        self._generation += 1
+
+        # Zeilen-Caches um die eingefügten bzw. gelöschten Zeilen nachziehen
+        for cache in (self.line_states, self.line_tokens):
+            if len(cache) > first_line:
+                if line_delta > 0:
+                    cache[first_line:first_line] = [None] * line_delta
+                elif line_delta < 0:
+                    del cache[first_line : first_line - line_delta]
+        # Die Tags der geänderten Zeile sind mit dem Text verschoben worden
+        if len(self.line_tokens) >= first_line:
+            self.line_tokens[first_line - 1] = None
+        self.pairs.splice(first_line, line_delta)
+        for callback in self.edit_callbacks:
+            callback(first_line, line_delta)
+        self.schedule_highlight()
+
+    def schedule_highlight(self, event=None):
+        """Plant einen Durchlauf, sobald idle_delay_ms lang nichts geändert wurde
+
+        Jede weitere Änderung verschiebt den Durchlauf, sodass Tastenfolgen
+        und Autorepeat zu einem einzigen Durchlauf zusammengefasst werden.
+        """
+        if self._suspend_count or self.revision == self._highlighted_revision:
+            return
+        if self._highlight_job is not None:
+            self.text_widget.after_cancel(self._highlight_job)
+        self._highlight_job = self.text_widget.after(
+            self.idle_delay_ms, self._run_scheduled_highlight
+        )
+
+    def _run_scheduled_highlight(self):
+        """Führt den entprellten Durchlauf aus"""
+        self._highlight_job = None
+        if self.revision == self._highlighted_revision:
+            return
+        if self.incremental:
+            self.highlight_dirty_lines()
+        else:
+            self.highlight_syntax()
+        self._on_cursor_move()
+
+    def suspend(self):
+        """Setzt die Hervorhebung für eine Block-Änderung aus
+
+        Änderungen werden weiter vorgemerkt und erst mit resume() in einem
+        Durchlauf hervorgehoben. Aufrufe dürfen verschachtelt werden.
+        """
+        self._suspend_count += 1
+        if self._highlight_job is not None:
+            self.text_widget.after_cancel(self._highlight_job)
+            self._highlight_job = None
+
+    def resume(self):
+        """Beendet suspend() und hebt die vorgemerkten Änderungen hervor"""
+        self._suspend_count -= 1
+        if not self._suspend_count:
+            self._run_scheduled_highlight()
+
+    def mark_dirty(self, first_line, last_line, line_delta=0):
+        """Erweitert den geänderten Zeilenbereich
+
+        Ein bereits vorgemerkter Bereich hinter der Änderung wird um die
+        eingefügten bzw. gelöschten Zeilen verschoben.
+        """
+        if self.dirty_lines is not None:
+            old_first, old_last = self.dirty_lines
+            if old_first > first_line:
+                old_first = max(first_line, old_first + line_delta)
+            if old_last >= first_line:
+                old_last = max(first_line, old_last + line_delta)
+            first_line = min(first_line, old_first)
+            last_line = max(last_line, old_last)
+        self.dirty_lines = (first_line, last_line)
 
     def configure_tags(self):
         """Konfiguriert die Text-Tags für das Solarized Dark Theme"""
@@ -589,96 +1401,614 @@ class BashSyntaxHighlighter:
         # Kommentare
         self.tag_configs["comments"] = {
             "foreground": sol_base01,
-            "font": ("Courier", 10, "italic bold"),
+            "font": self.fonts["italic"],
         }
         self.text_widget.tag_configure("comments", **self.tag_configs["comments"])
 
         # Shebang
         self.tag_configs["shebang"] = {
             "foreground": sol_cyan,
-            "font": ("Courier", 10, "bold"),
+            "font": self.fonts["bold"],
         }
         self.text_widget.tag_configure("shebang", **self.tag_configs["shebang"])
 
         # Strings
         self.tag_configs["strings"] = {
             "foreground": sol_orange,
-            "font": ("Courier", 10, "bold"),
+            "font": self.fonts["bold"],
         }
         self.text_widget.tag_configure("strings", **self.tag_configs["strings"])
 
         # Variablen
         self.tag_configs["variables"] = {
             "foreground": sol_blue,
-            "font": ("Courier", 10, "bold"),
+            "font": self.fonts["bold"],
         }
         self.text_widget.tag_configure("variables", **self.tag_configs["variables"])
 
         # Befehle & Schlüsselwörter
         self.tag_configs["commands"] = {
             "foreground": sol_green,
-            "font": ("Courier", 10, "bold"),
+            "font": self.fonts["bold"],
         }
         self.text_widget.tag_configure("commands", **self.tag_configs["commands"])
 
         # Operatoren
         self.tag_configs["operators"] = {
             "foreground": sol_magenta,
-            "font": ("Courier", 10, "bold"),
+            "font": self.fonts["bold"],
         }
         self.text_widget.tag_configure("operators", **self.tag_configs["operators"])
 
         # Zahlen
         self.tag_configs["numbers"] = {
             "foreground": sol_orange,
-            "font": ("Courier", 10, "bold"),
+            "font": self.fonts["bold"],
         }
         self.text_widget.tag_configure("numbers", **self.tag_configs["numbers"])
 
         # Klammern
         self.tag_configs["brackets"] = {
             "foreground": sol_base0,
-            "font": ("Courier", 10, "bold"),
+            "font": self.fonts["bold"],
         }
         self.text_widget.tag_configure("brackets", **self.tag_configs["brackets"])
 
+        # Klammer-/Blockpaar am Cursor
+        self.tag_configs[self.PAIR_TAG] = {"background": sol_base01}
+        self.text_widget.tag_configure(self.PAIR_TAG, **self.tag_configs[self.PAIR_TAG])
+
+    @staticmethod
+    def create_fonts(widget, font=("Courier", 10, "bold")):
+        """Erzeugt die gemeinsam genutzten Font-Objekte normal, bold und italic
+
+        normal entspricht font, bold und italic (fett und kursiv) leiten
+        sich davon ab.
+        """
+        fonts = {
+            "normal": tkfont.Font(root=widget, font=font),
+            "bold": tkfont.Font(root=widget, font=font),
+            "italic": tkfont.Font(root=widget, font=font),
+        }
+        fonts["bold"].configure(weight="bold")
+        fonts["italic"].configure(weight="bold", slant="italic")
+        return fonts
+
     def highlight_syntax(self, event=None):
-        """Hebt die Syntax im Text hervor"""
+        """Hebt die Syntax im Text hervor
+
+        Zuerst wird der sichtbare Bereich gefärbt, der Rest des Dokuments
+        folgt schrittweise im Hintergrund.
+        """
         if not self.highlighting_active:
             return
 
-        # Entferne alle vorhandenen Tags
-        for tag in self.patterns.keys():
-            self.text_widget.tag_remove(tag, "1.0", tk.END)
+        self.dirty_lines = None
+        self._highlighted_revision = self.revision
+        self._generation += 1
+        self.line_states = [self.INITIAL_STATE]
+        self.text_widget.tag_add(self.PENDING_TAG, "1.0", tk.END)
+        self._highlight_visible()
 
-        # Hole den gesamten Text
-        text_content = self.text_widget.get("1.0", tk.END)
+    def highlight_dirty_lines(self):
+        """Hebt die seit dem letzten Durchlauf geänderten Zeilen hervor
 
-        # Hebe jedes Muster hervor
-        for tag_name, pattern in self.patterns.items():
-            self._highlight_pattern(tag_name, pattern, text_content)
+        Sichtbare Zeilen werden sofort gefärbt, der Rest (z.B. bei großen
+        Einfügungen) wird im Hintergrund nachgeholt.
+        """
+        if not self.highlighting_active or self.dirty_lines is None:
+            return
 
-    def _highlight_pattern(self, tag_name, pattern, text_content):
-        """Hebt ein bestimmtes Muster hervor"""
-        try:
-            for match in re.finditer(pattern, text_content, re.MULTILINE):
-                start = f"1.0 + {match.start()} chars"
-                end = f"1.0 + {match.end()} chars"
+        first_line, last_line = self.dirty_lines
+        self.dirty_lines = None
+        self._highlighted_revision = self.revision
+        self.text_widget.tag_add(
+            self.PENDING_TAG, f"{first_line}.0", f"{last_line + 1}.0"
+        )
+        self._highlight_visible()
 
-                self.text_widget.tag_add(tag_name, start, end)
-        except re.error:
-            # Überspringe ungültige Regex-Muster
-            pass
+    def visible_lines(self):
+        """Gibt die erste und letzte sichtbare Zeile zurück"""
+        first = self.text_widget.index("@0,0")
+        last = self.text_widget.index(f"@0,{self.text_widget.winfo_height()}")
+        return int(first.split(".")[0]), int(last.split(".")[0])
+
+    def _highlight_visible(self):
+        """Hebt alle ausstehenden Zeilen im sichtbaren Bereich hervor"""
+        self._visible_job = None
+        if not self.highlighting_active:
+            return
+
+        first_line, last_line = self.visible_lines()
+        search_from = f"{first_line}.0"
+        search_to = f"{last_line + 1}.0"
+        while True:
+            pending = self.text_widget.tag_nextrange(
+                self.PENDING_TAG, search_from, search_to
+            )
+            if not pending:
+                break
+            range_first, range_last = self._pending_lines(*pending)
+            range_first = max(range_first, first_line)
+            range_last = min(range_last, last_line)
+            self._highlight_pending_lines(range_first, range_last)
+            search_from = f"{range_last + 1}.0"
+
+        self._schedule_background()
+
+    def _pending_lines(self, start, end):
+        """Wandelt einen Bereich des Pending-Tags in ganze Zeilen um"""
+        first_line = int(start.split(".")[0])
+        last_line, last_col = (int(part) for part in end.split("."))
+        if last_col == 0 and last_line > first_line:
+            last_line -= 1
+        return first_line, last_line
+
+    def _highlight_pending_lines(self, first_line, last_line):
+        """Hebt Zeilen hervor und entfernt ihre Pending-Markierung"""
+        self.highlight_lines(first_line, last_line)
+        self.text_widget.tag_remove(
+            self.PENDING_TAG, f"{first_line}.0", f"{last_line + 1}.0"
+        )
+
+    def _schedule_background(self):
+        """Plant den nächsten Hintergrundschritt, falls noch Text aussteht
+
+        Läuft ein aktueller Worker-Thread, werden dessen Ergebnisse abgeholt;
+        steht ein großer Bereich aus, wird ein neuer Worker gestartet.
+        """
+        if self._background_job is not None or self.viewport_only:
+            return
+        pending = self.text_widget.tag_nextrange(self.PENDING_TAG, "1.0")
+        if not pending:
+            return
+
+        if self._worker_generation != self._generation and self.threaded:
+            first_line = self._pending_lines(*pending)[0]
+            last_line = self._pending_lines(
+                *self.text_widget.tag_prevrange(self.PENDING_TAG, tk.END)
+            )[1]
+            if last_line - first_line + 1 >= self.thread_min_lines:
+                self._start_worker(first_line, last_line)
+
+        if self._worker_generation == self._generation:
+            self._background_job = self.text_widget.after(
+                self.worker_poll_ms, self._drain_worker_results
+            )
+        else:
+            self._background_job = self.text_widget.after(
+                self.background_delay_ms, self._highlight_background_step
+            )
+
+    def _highlight_background_step(self):
+        """Hebt ausstehende Zeilen hervor, bis das Zeitbudget verbraucht ist"""
+        self._background_job = None
+        if not self.highlighting_active or self.viewport_only:
+            return
+
+        deadline = time.perf_counter() + self.time_budget_ms / 1000
+        while time.perf_counter() < deadline:
+            pending = self.text_widget.tag_nextrange(self.PENDING_TAG, "1.0")
+            if not pending:
+                return
+            first_line, last_line = self._pending_lines(*pending)
+            last_line = min(last_line, first_line + self.chunk_lines - 1)
+            self._highlight_pending_lines(first_line, last_line)
+
+        self._schedule_background()
+
+    def _start_worker(self, first_line, last_line):
+        """Lext einen Schnappschuss der Zeilen first_line bis last_line im Thread"""
+        state = self.line_state(first_line)
+        text_content = self.text_widget.get(f"{first_line}.0", f"{last_line}.end")
+        self._worker_generation = self._generation
+        worker = threading.Thread(
+            target=self._tokenize_worker,
+            args=(self._generation, first_line, text_content, state),
+            daemon=True,
+        )
+        worker.start()
+
+    def _tokenize_worker(self, generation, first_line, text_content, state):
+        """Lext im Worker-Thread und reicht die Zeilen blockweise an die Queue
+
+        Greift nicht auf das Text-Widget zu. Bricht ab, sobald eine neuere
+        Generation begonnen hat; None als Zeilennummer meldet das Ende.
+        """
+        results = []
+        for line in text_content.split("\n"):
+            if generation != self._generation:
+                return
+            tokens, state = self.lexer.tokenize_line(line, state)
+            tokens = tuple(tokens)
+            results.append((tokens, state, pair_events(line, tokens)))
+            if len(results) == self.chunk_lines:
+                self._worker_results.put((generation, first_line, results))
+                first_line += len(results)
+                results = []
+        if results:
+            self._worker_results.put((generation, first_line, results))
+        self._worker_results.put((generation, None, None))
+
+    def _drain_worker_results(self):
+        """Übernimmt Ergebnisse des Worker-Threads, bis das Zeitbudget verbraucht ist"""
+        self._background_job = None
+        deadline = time.perf_counter() + self.time_budget_ms / 1000
+        while time.perf_counter() < deadline:
+            try:
+                generation, first_line, results = self._worker_results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self._generation:
+                continue  # veraltet, der Text hat sich inzwischen geändert
+            if first_line is None:
+                self._worker_generation = None
+                break
+            self._apply_line_results(first_line, results)
+            self.text_widget.tag_remove(
+                self.PENDING_TAG, f"{first_line}.0", f"{first_line + len(results)}.0"
+            )
+
+        if self._worker_generation != self._generation:
+            self._worker_generation = None
+        if self.highlighting_active:
+            self._schedule_background()
+
+    def highlight_lines(self, first_line, last_line):
+        """Hebt die Syntax im Zeilenbereich first_line bis last_line hervor
+
+        Ausgehend vom gespeicherten Zustand am Anfang von first_line wird
+        zeilenweise neu gelext. Weicht der Zustand am Ende des Bereichs vom
+        gespeicherten Zustand der Folgezeile ab (z.B. neu geöffneter String
+        oder Heredoc), wird die Folgezeile zum Neufärben vorgemerkt; sobald
+        die Zustände wieder übereinstimmen, endet die Neuberechnung.
+        """
+        start = f"{first_line}.0"
+        end = f"{last_line}.end"
+
+        state = self.line_state(first_line)
+        results = []
+        for line in self.text_widget.get(start, end).split("\n"):
+            tokens, state = self.tokenize_line(line, state)
+            tokens = tuple(tokens)
+            results.append((tokens, state, pair_events(line, tokens)))
+        self._apply_line_results(first_line, results)
+
+    def _apply_line_results(self, first_line, results):
+        """Setzt die Tags für gelexte Zeilen ab first_line
+
+        results enthält je Zeile (Tokens, Zustand am Zeilenende, Klammern und
+        Block-Schlüsselwörter). Gesetzt werden nur die Unterschiede zu den
+        zuletzt gesetzten Tokens.
+        """
+        line_count = first_line + len(results)
+        for cache in (self.line_states, self.line_tokens):
+            if len(cache) < line_count:
+                cache.extend([None] * (line_count - len(cache)))
+
+        states = self.line_states
+        applied = self.line_tokens
+        additions = {}
+        removals = {}
+        cleared_lines = []
+        state = None
+        set_pair_events = self.pairs.set_line
+        for line_number, (tokens, end_state, events) in enumerate(results, first_line):
+            if line_number > first_line:
+                states[line_number - 1] = state
+            state = end_state
+            set_pair_events(line_number, events)
+
+            old_tokens = applied[line_number - 1]
+            if old_tokens == tokens:
+                continue
+            applied[line_number - 1] = tokens
+            if old_tokens is None:
+                # Unbekannter Stand: Zeile komplett leeren und neu setzen
+                cleared_lines.append(line_number)
+                old_tokens = ()
+            else:
+                old_tokens = set(old_tokens)
+                tokens = set(tokens)
+                old_tokens, tokens = old_tokens - tokens, tokens - old_tokens
+
+            for tag_name, start_col, end_col in old_tokens:
+                removals.setdefault(tag_name, []).extend(
+                    (f"{line_number}.{start_col}", f"{line_number}.{end_col}")
+                )
+            for tag_name, start_col, end_col in tokens:
+                additions.setdefault(tag_name, []).extend(
+                    (f"{line_number}.{start_col}", f"{line_number}.{end_col}")
+                )
+
+        self._apply_tag_changes(removals, additions, cleared_lines)
+        self._store_state(line_count, state)
+
+    @staticmethod
+    def _line_ranges(line_numbers):
+        """Fasst aufsteigende Zeilennummern zu Index-Paaren zusammenhängender Zeilen zusammen"""
+        ranges = []
+        run_first = run_last = line_numbers[0]
+        for line_number in line_numbers[1:]:
+            if line_number != run_last + 1:
+                ranges.extend((f"{run_first}.0", f"{run_last}.end"))
+                run_first = line_number
+            run_last = line_number
+        ranges.extend((f"{run_first}.0", f"{run_last}.end"))
+        return ranges
+
+    def _apply_tag_changes(self, removals, additions, cleared_lines=()):
+        """Entfernt und setzt Tags gebündelt: ein Tcl-Aufruf pro Tag und Richtung
+
+        Von den Zeilen in cleared_lines werden zuvor alle Highlight-Tags in
+        einem einzigen Aufruf entfernt.
+        """
+        widget_path = str(self.text_widget)
+        call = self.text_widget.tk.call
+        if cleared_lines:
+            cleared_ranges = " ".join(self._line_ranges(cleared_lines))
+            call(
+                "foreach",
+                "tag",
+                tuple(self.patterns.keys()),
+                f"{widget_path} tag remove $tag {cleared_ranges}",
+            )
+        for tag_name, indices in removals.items():
+            call(widget_path, "tag", "remove", tag_name, *indices)
+        for tag_name, indices in additions.items():
+            call(widget_path, "tag", "add", tag_name, *indices)
+
+    def line_state(self, line_number):
+        """Liefert den Lexer-Zustand am Anfang der Zeile line_number
+
+        Fehlt der Zustand im Cache, wird ab der letzten bekannten Zeile
+        nachgelext, ohne Tags zu setzen.
+        """
+        states = self.line_states
+        if len(states) < line_number:
+            states.extend([None] * (line_number - len(states)))
+
+        known = line_number - 1
+        while states[known] is None:
+            known -= 1
+        if known == line_number - 1:
+            return states[known]
+        if self.viewport_only and line_number - 1 - known > self.thread_min_lines:
+            # Großdatei-Modus: große Lücken werden nicht nachgelext, der
+            # Zustand wird als Ausgangszustand angenähert
+            states[line_number - 1] = self.INITIAL_STATE
+            return self.INITIAL_STATE
+
+        state = states[known]
+        text_content = self.text_widget.get(f"{known + 1}.0", f"{line_number - 1}.end")
+        for index, line in enumerate(text_content.split("\n"), known + 1):
+            _, state = self.tokenize_line(line, state)
+            states[index] = state
+        return state
+
+    def _store_state(self, line_number, state):
+        """Speichert den Zustand am Anfang einer Zeile
+
+        Ändert er sich, wird die Zeile zum Neufärben vorgemerkt.
+        """
+        states = self.line_states
+        if len(states) < line_number:
+            states.extend([None] * (line_number - len(states)))
+        if states[line_number - 1] == state:
+            return
+        states[line_number - 1] = state
+        self.text_widget.tag_add(
+            self.PENDING_TAG, f"{line_number}.0", f"{line_number + 1}.0"
+        )
+
+    def tokenize(self, text_content, state=None):
+        """Zerlegt den Text in Tokens (tag_name, start, end), siehe BashLexer"""
+        return self.lexer.tokenize(text_content, state)
+
+    def tokenize_line(self, line, state):
+        """Zerlegt eine Zeile ab dem Zustand am Zeilenanfang, siehe BashLexer"""
+        return self.lexer.tokenize_line(line, state)
+
+    def highlight_matching_pair(self):
+        """Hebt die Klammer bzw. das Block-Schlüsselwort am Cursor und ihr Gegenstück hervor
+
+        Das Paar wird per Binärsuche im Paar-Index gefunden, der Text wird
+        dafür nicht durchsucht.
+        """
+        self._pair_job = None
+        self.text_widget.tag_remove(self.PAIR_TAG, "1.0", tk.END)
+        if not self.highlighting_active:
+            return
+        line, col = self.text_widget.index(tk.INSERT).split(".")
+        pair = self.pairs.find_pair(int(line), int(col))
+        if pair is None:
+            return
+        indices = []
+        for line_number, start_col, end_col in pair:
+            indices.extend((f"{line_number}.{start_col}", f"{line_number}.{end_col}"))
+        self.text_widget.tag_add(self.PAIR_TAG, *indices)
+
+    def add_command_words(self, words):
+        """Hebt weitere Programme an Befehlsposition hervor
+
+        Die Wörter beeinflussen den Lexer-Zustand nicht, die gespeicherten
+        Zeilenzustände bleiben daher gültig. Neu gefärbt werden nur Zeilen,
+        in denen eines der Wörter vorkommt. Im Großdatei-Modus wird der Text
+        nicht durchsucht: alle Zeilen werden vorgemerkt und erst gefärbt,
+        wenn sie sichtbar werden.
+        """
+        lexer = self.lexer
+        new_words = set(words) - self.command_words - lexer.path_words
+        if not new_words:
+            return
+        lexer.path_words.update(new_words)
+        if not self.highlighting_active:
+            return
+
+        self._generation += 1  # laufender Worker lext noch ohne die Wörter
+        if self.viewport_only:
+            self.text_widget.tag_add(self.PENDING_TAG, "1.0", tk.END)
+            self._highlight_visible()
+            return
+
+        text_content = self.text_widget.get("1.0", "end-1c")
+        for line_number, line in enumerate(text_content.split("\n"), 1):
+            if not new_words.isdisjoint(self.WORD_PATTERN.findall(line)):
+                self.text_widget.tag_add(
+                    self.PENDING_TAG, f"{line_number}.0", f"{line_number + 1}.0"
+                )
+        self._highlight_visible()
+
+    def set_viewport_only(self, enabled):
+        """Beschränkt die Hervorhebung auf den sichtbaren Bereich
+
+        Beim Ausschalten wird das Dokument vollständig neu gefärbt, da im
+        reduzierten Modus Zustände nur angenähert werden.
+        """
+        if enabled == self.viewport_only:
+            return
+        self.viewport_only = enabled
+        if enabled:
+            self._generation += 1  # laufenden Worker-Thread abbrechen
+        else:
+            self.highlight_syntax()
 
     def toggle_highlighting(self):
         """Schaltet Syntax-Highlighting ein/aus"""
         self.highlighting_active = not self.highlighting_active
+        self._generation += 1
         if self.highlighting_active:
             self.highlight_syntax()
         else:
             # Entferne alle Tags
             for tag in self.patterns.keys():
                 self.text_widget.tag_remove(tag, "1.0", tk.END)
+            self.text_widget.tag_remove(self.PENDING_TAG, "1.0", tk.END)
+            self.text_widget.tag_remove(self.PAIR_TAG, "1.0", tk.END)
+            self.line_tokens = []
+            self.pairs.clear()
+
+
+class LineNumberGutter(tk.Canvas):
+    """Zeilennummern-Leiste neben einem Text-Widget
+
+    Gezeichnet werden nur die Nummern der sichtbaren Zeilen, deren Position
+    per dlineinfo ermittelt wird. Neu gezeichnet wird nur nach Scrollen,
+    einer Größenänderung oder einer Änderung der Zeilenzahl; der Aufwand
+    hängt also nicht von der Größe der Datei ab. Das "see" nach jedem
+    Tastendruck führt nur dann zum Neuzeichnen, wenn sich der sichtbare
+    Bereich tatsächlich verschoben hat.
+    """
+
+    def __init__(self, parent, text_widget, font=None, **kwargs):
+        kwargs.setdefault("highlightthickness", 0)
+        kwargs.setdefault("borderwidth", 0)
+        kwargs.setdefault("background", text_widget.cget("background"))
+        super().__init__(parent, **kwargs)
+        self.text_widget = text_widget
+        self.font = font if font is not None else tkfont.nametofont("TkFixedFont")
+        self.foreground = "#586e75"  # Solarized base01, wie Kommentare
+        self.padding = 6
+        self.min_digits = 2
+
+        # y-Position jeder zuletzt gezeichneten Zeile
+        self.line_positions = {}
+        self._width = None
+        # Ein einziger Zeichen-Job für alle Auslöser; er zeichnet vollständig
+        # neu, sobald ein Auslöser das verlangt hat, sonst nur, wenn sich eine
+        # der vorgemerkten Zeilen verschoben hat
+        self._redraw_job = None
+        self._full_redraw = False
+        self._moved_candidates = set()
+        # Sichtbarer Bereich der letzten Zeichnung und ob er zu prüfen ist
+        self._drawn_view = None
+        self._view_check = False
+
+        self.bind("<Configure>", self.schedule_redraw)
+
+    def schedule_redraw(self, event=None):
+        """Plant ein vollständiges Neuzeichnen, sobald Tk untätig ist"""
+        self._full_redraw = True
+        self._schedule_job()
+
+    def on_view_change(self):
+        """Nimmt yview/see des Text-Widgets entgegen; geprüft wird im Zeichen-Job"""
+        self._view_check = True
+        self._schedule_job()
+
+    def _schedule_job(self):
+        """Plant den Zeichen-Job, falls noch keiner aussteht"""
+        if self._redraw_job is None:
+            self._redraw_job = self.after_idle(self._run_redraw_job)
+
+    def on_text_edit(self, first_line, line_delta):
+        """Nimmt die Änderungsmeldungen des Highlighters entgegen
+
+        Ändert sich die Zeilenzahl nicht, wird nur bei Zeilenumbruch geprüft,
+        ob die geänderte Zeile nun mehr oder weniger Bildschirmzeilen belegt.
+        """
+        if line_delta:
+            self.schedule_redraw()
+        elif (
+            first_line in self.line_positions
+            and self.text_widget.cget("wrap") != tk.NONE
+        ):
+            self._moved_candidates.add(first_line + 1)
+            self._schedule_job()
+
+    def _run_redraw_job(self):
+        """Zeichnet neu, wenn es verlangt wurde oder sich eine Zeile verschoben hat"""
+        self._redraw_job = None
+        candidates = self._moved_candidates
+        self._moved_candidates = set()
+        view_moved = self._view_check and self._current_view() != self._drawn_view
+        self._view_check = False
+        if self._full_redraw or view_moved or any(map(self._line_moved, candidates)):
+            self.redraw()
+
+    def _current_view(self):
+        """Liefert den sichtbaren Bereich als (erster Index, yview)"""
+        text = self.text_widget
+        return text.index("@0,0"), text.yview()
+
+    def _line_moved(self, line_number):
+        """Prüft, ob die Zeile line_number nicht mehr an ihrer Position steht"""
+        info = self.text_widget.dlineinfo(f"{line_number}.0")
+        position = info[1] if info is not None else None
+        return position != self.line_positions.get(line_number)
+
+    def redraw(self):
+        """Zeichnet die Nummern der sichtbaren Zeilen"""
+        self._full_redraw = False
+        text = self.text_widget
+        line_count = int(text.index("end-1c").split(".")[0])
+        digits = max(self.min_digits, len(str(line_count)))
+        width = self.font.measure("9" * digits) + 2 * self.padding
+        if width != self._width:
+            self._width = width
+            self.configure(width=width)
+
+        self.delete("all")
+        positions = {}
+        index = text.index("@0,0")
+        line_number = int(index.split(".")[0])
+        while line_number <= line_count:
+            info = text.dlineinfo(index)
+            if info is None:
+                break
+            positions[line_number] = info[1]
+            self.create_text(
+                width - self.padding,
+                info[1],
+                anchor=tk.NE,
+                text=str(line_number),
+                font=self.font,
+                fill=self.foreground,
+            )
+            line_number += 1
+            index = f"{line_number}.0"
+        self.line_positions = positions
+        self._drawn_view = self._current_view()
 
 
 class BashScriptEditor(ScrolledText):
@@ -691,30 +2021,31 @@ class BashScriptEditor(ScrolledText):
         # Konfigurationen an das zugrundeliegende Text-Widget via kwargs weitergeben
         kwargs.setdefault("font", ("Courier", 10, "bold"))
         self.base_font = kwargs.get("font")
+        # Editor und Syntax-Tags teilen sich benannte Font-Objekte
+        self.fonts = BashSyntaxHighlighter.create_fonts(parent, self.base_font)
+        kwargs["font"] = self.fonts["normal"]
         kwargs.setdefault("tabs", (f"{self.tab_size}c",))
 
         super().__init__(parent, **kwargs)
 
-        # Einrückungs-Schlüsselwörter
-        self.indent_keywords = {
-            "if",
-            "then",
-            "else",
-            "elif",
-            "for",
-            "while",
-            "until",
-            "case",
-            "function",
-            "do",
-        }
-        self.dedent_keywords = {"fi", "done", "esac", "else", "elif"}
-
         # Syntax-Highlighter initialisieren
-        self.highlighter = BashSyntaxHighlighter(self.text)
+        self.highlighter = BashSyntaxHighlighter(self.text, fonts=self.fonts)
+
+        # Zeilennummern links neben dem Text
+        self.gutter = LineNumberGutter(self, self.text, font=self.fonts["normal"])
+        self.gutter.pack(side=tk.LEFT, fill=tk.Y, before=self.text)
+        self.highlighter.edit_callbacks.append(self.gutter.on_text_edit)
+        self.highlighter.view_callbacks.append(self.gutter.on_view_change)
 
         # Autocomplete initialisieren
         self.autocomplete = BashAutocomplete(self.text)
+        self.autocomplete.track_edits(self.highlighter)
+        # Installierte Programme aus $PATH ergänzen Vorschläge und Hervorhebung
+        self.autocomplete.load_path_commands(self.highlighter.add_command_words)
+
+        # Großdatei-Modus (siehe set_large_file_mode)
+        self.large_file_mode = False
+        self._wrap_before_large_file = None
 
         # Veraltete .config Aufrufe entfernt, da sie über kwargs an den Konstruktor übergeben werden
         # und teilweise mit dem Theme "superhero" in Konflikt stehen.
@@ -759,6 +2090,11 @@ class BashScriptEditor(ScrolledText):
             command=self.comment_uncomment_selection,
             accelerator="Ctrl+/",
         )
+        self.context_menu.add_command(
+            label="Einrückung korrigieren",
+            command=self.reindent,
+            accelerator="Ctrl+Shift+I",
+        )
         self.context_menu.add_separator()
         self.context_menu.add_command(
             label="Autovervollständigung",
@@ -774,29 +2110,44 @@ class BashScriptEditor(ScrolledText):
         # Rechtsklick-Event binden
         self.text.bind("<Button-3>", self.show_context_menu)
 
-        # Zusätzliche Tastenkombinationen
+        # Zusätzliche Tastenkombinationen; "break" verhindert die Standard-
+        # Belegung des Text-Widgets (Strg+D löscht, Strg+/ wählt alles aus)
+        def shortcut(command):
+            return lambda event: command() or "break"
+
         self.text.bind("<Control-a>", lambda e: self.select_all())
-        self.text.bind("<Control-d>", lambda e: self.duplicate_line())
-        self.text.bind("<Control-slash>", lambda e: self.comment_uncomment_selection())
+        self.text.bind("<Control-d>", shortcut(self.duplicate_line))
+        self.text.bind("<Control-slash>", shortcut(self.comment_uncomment_selection))
+        self.text.bind("<Control-Shift-I>", shortcut(self.reindent))
 
     def update_font(self, font_family, font_size):
-        """Aktualisiert die Schriftart des Editors."""
-        new_font = (font_family, font_size, "bold")
-        self.text.config(font=new_font)
-        # Sorge dafür, dass die Syntax-Tags die neue Schriftgröße übernehmen, aber ihre Stile beibehalten
-        for tag_name, config in self.highlighter.tag_configs.items():
-            font_config = config.get("font")
-            if (
-                font_config
-                and isinstance(font_config, (list, tuple))
-                and len(font_config) == 3
-            ):
-                # Behält den Stil (italic, bold) bei
-                style = font_config[2]
-                self.text.tag_configure(tag_name, font=(font_family, font_size, style))
-            else:
-                # Standard-Schriftart für andere Tags
-                self.text.tag_configure(tag_name, font=new_font)
+        """Aktualisiert die Schriftart des Editors.
+
+        Da Editor und Syntax-Tags dieselben Font-Objekte verwenden, reicht ein
+        configure je Font; Tk zeichnet alles neu, ohne Tags neu zu setzen.
+        """
+        for font in self.fonts.values():
+            font.configure(family=font_family, size=font_size)
+        self.base_font = (font_family, font_size) + tuple(self.base_font[2:])
+        self.gutter.schedule_redraw()
+
+    def set_large_file_mode(self, enabled):
+        """Schaltet den Großdatei-Modus ein oder aus
+
+        Im Großdatei-Modus wird nur der sichtbare Bereich hervorgehoben, der
+        Zeilenumbruch ist abgeschaltet und die Autovervollständigung
+        durchsucht den Text nicht nach Variablen.
+        """
+        if enabled == self.large_file_mode:
+            return
+        self.large_file_mode = enabled
+        if enabled:
+            self._wrap_before_large_file = self.text.cget("wrap")
+            self.text.configure(wrap=tk.NONE)
+        else:
+            self.text.configure(wrap=self._wrap_before_large_file)
+        self.autocomplete.scan_variables = not enabled
+        self.highlighter.set_viewport_only(enabled)
 
     def show_context_menu(self, event):
         """Zeigt das Kontextmenü an"""
@@ -833,32 +2184,32 @@ class BashScriptEditor(ScrolledText):
             pass
 
     def duplicate_line(self):
-        """Dupliziert die aktuelle Zeile"""
-        current_line = self.index(tk.INSERT).split(".")[0]
-        line_content = self.get(f"{current_line}.0", f"{current_line}.end")
-
-        # Füge die Zeile nach der aktuellen ein
-        self.insert(f"{current_line}.end", "\n" + line_content)
+        """Dupliziert die aktuelle Zeile bzw. die ausgewählten Zeilen"""
+        selection = self._selected_lines()
+        if selection is None:
+            current_line = int(self.index(tk.INSERT).split(".")[0])
+            selection = (current_line, current_line)
+        self.edit_lines(*selection, lambda lines: lines + lines)
 
     def comment_uncomment_selection(self):
-        """Kommentiert/entfernt Kommentar von ausgewähltem Text"""
-        selected_text = self.get_selected_text()
-        if not selected_text:
+        """Kommentiert/entfernt Kommentar von den ausgewählten Zeilen"""
+        selection = self._selected_lines()
+        if selection is None:
             return
 
-        lines = selected_text.split("\n")
-        commented_lines = []
+        def toggle(lines):
+            commented_lines = []
+            for line in lines:
+                if line.strip().startswith("#"):
+                    # Entferne Kommentar
+                    commented_lines.append(line.replace("#", "", 1).lstrip())
+                else:
+                    # Füge Kommentar hinzu
+                    commented_lines.append("# " + line)
+            return commented_lines
 
-        for line in lines:
-            if line.strip().startswith("#"):
-                # Entferne Kommentar
-                commented_lines.append(line.replace("#", "", 1).lstrip())
-            else:
-                # Füge Kommentar hinzu
-                commented_lines.append("# " + line)
-
-        new_text = "\n".join(commented_lines)
-        self.replace_selected_text(new_text)
+        self.edit_lines(*selection, toggle)
+        self._select_lines(*selection)
 
     def handle_tab(self, event):
         """Behandelt Tab-Taste für Einrückung"""
@@ -873,12 +2224,24 @@ class BashScriptEditor(ScrolledText):
 
     def handle_return(self, event):
         """Behandelt Enter-Taste mit automatischer Einrückung"""
-        # Hole die aktuelle Zeile
-        current_line = self.index(tk.INSERT).split(".")[0]
-        line_content = self.get(f"{current_line}.0", f"{current_line}.end")
+        current_line = int(self.index(tk.INSERT).split(".")[0])
+        line_content = self.get(f"{current_line}.0", tk.INSERT)
 
-        # Berechne Einrückung für die nächste Zeile
-        indent_level = self._calculate_indent_level(line_content)
+        # Beginnt die Zeile mit fi, done, else usw., wird sie selbst ausgerückt
+        line_level, indent_level = self._calculate_indent_level(
+            current_line, line_content
+        )
+        words = line_content.split()
+        first_word = words[0].rstrip(";") if words else ""
+        if line_level is not None and (
+            first_word in INDENT_CLOSERS or first_word in INDENT_MIDDLES
+        ):
+            indent = len(line_content) - len(line_content.lstrip(" \t"))
+            if line_level * self.tab_size < indent:
+                self.delete(
+                    f"{current_line}.0",
+                    f"{current_line}.{indent - line_level * self.tab_size}",
+                )
 
         # Füge Zeilenumbruch und Einrückung ein
         self.insert(tk.INSERT, "\n" + " " * (indent_level * self.tab_size))
@@ -960,60 +2323,145 @@ class BashScriptEditor(ScrolledText):
 
     def _indent_selection(self):
         """Rückt alle ausgewählten Zeilen ein"""
-        start_line = self.index(tk.SEL_FIRST).split(".")[0]
-        end_line = self.index(tk.SEL_LAST).split(".")[0]
-
-        for line_num in range(int(start_line), int(end_line) + 1):
-            line_start = f"{line_num}.0"
-            self.insert(line_start, " " * self.tab_size)
-
-        # Aktualisiere Auswahl
-        new_start = f"{start_line}.0 + {self.tab_size} chars"
-        new_end = f"{end_line}.end + {self.tab_size} chars"
-        self.tag_remove(tk.SEL, "1.0", tk.END)
-        self.tag_add(tk.SEL, new_start, new_end)
+        selection = self._selected_lines()
+        indent = " " * self.tab_size
+        self.edit_lines(*selection, lambda lines: [indent + line for line in lines])
+        self._select_lines(*selection)
 
     def _dedent_selection(self):
         """Rückt alle ausgewählten Zeilen aus"""
-        start_line = self.index(tk.SEL_FIRST).split(".")[0]
-        end_line = self.index(tk.SEL_LAST).split(".")[0]
-
-        total_removed = 0
-        for line_num in range(int(start_line), int(end_line) + 1):
-            line_start = f"{line_num}.0"
-            line_content = self.get(line_start, f"{line_num}.end")
-
-            leading_spaces = len(line_content) - len(line_content.lstrip())
-            spaces_to_remove = min(leading_spaces, self.tab_size)
-
-            if spaces_to_remove > 0:
-                end_pos = f"{line_start} + {spaces_to_remove} chars"
-                self.delete(line_start, end_pos)
-                total_removed += spaces_to_remove
-
-        # Aktualisiere Auswahl
-        if total_removed > 0:
-            new_end = f"{end_line}.end - {total_removed} chars"
-            self.tag_remove(tk.SEL, "1.0", tk.END)
-            self.tag_add(tk.SEL, tk.SEL_FIRST, new_end)
-
-    def _calculate_indent_level(self, line_content):
-        """Berechnet die Einrückungsebene für die nächste Zeile"""
-        stripped_line = line_content.strip()
-
-        # Prüfe auf Einrückung-erhöhende Schlüsselwörter
-        if any(keyword in stripped_line for keyword in self.indent_keywords):
-            return (len(line_content) - len(line_content.lstrip())) // self.tab_size + 1
-
-        # Prüfe auf Einrückung-verringernde Schlüsselwörter
-        if any(keyword in stripped_line for keyword in self.dedent_keywords):
-            current_indent = (
-                len(line_content) - len(line_content.lstrip())
-            ) // self.tab_size
-            return max(0, current_indent - 1)
-
-        # Behalte aktuelle Einrückungsebene bei
-        return (len(line_content) - len(line_content.lstrip())) // self.tab_size
+        selection = self._selected_lines()
+
+        def dedent(lines):
+            dedented_lines = []
+            for line in lines:
+                leading_spaces = len(line) - len(line.lstrip())
+                dedented_lines.append(line[min(leading_spaces, self.tab_size) :])
+            return dedented_lines
+
+        self.edit_lines(*selection, dedent)
+        self._select_lines(*selection)
+
+    def _selected_lines(self):
+        """Liefert (erste, letzte Zeile) der Auswahl oder None
+
+        Endet die Auswahl am Anfang einer Zeile, zählt diese nicht mit.
+        """
+        try:
+            first_line = int(self.index(tk.SEL_FIRST).split(".")[0])
+            last_line, last_col = map(int, self.index(tk.SEL_LAST).split("."))
+        except tk.TclError:
+            return None
+        if last_col == 0 and last_line > first_line:
+            last_line -= 1
+        return first_line, last_line
+
+    def _select_lines(self, first_line, last_line):
+        """Wählt die Zeilen first_line bis last_line vollständig aus"""
+        self.tag_remove(tk.SEL, "1.0", tk.END)
+        self.tag_add(tk.SEL, f"{first_line}.0", f"{last_line}.end")
+
+    def edit_lines(self, first_line, last_line, transform):
+        """Wendet transform auf die Zeilen first_line bis last_line an
+
+        transform erhält die Zeilen als Liste und liefert die neuen Zeilen.
+        Der Bereich wird einmal gelesen und mit replace_lines in einem
+        Schritt ersetzt.
+        """
+        lines = self.get(f"{first_line}.0", f"{last_line}.end").split("\n")
+        new_lines = transform(lines)
+        if new_lines != lines:
+            self.replace_lines(first_line, last_line, new_lines)
+
+    def _indent_engine_at(self, line_number):
+        """Liefert eine IndentEngine, die alle Zeilen vor line_number kennt
+
+        Gelesen und gelext wird nicht ab dem Textanfang, sondern erst ab der
+        letzten Zeile davor, die uneingerückt auf oberster Ebene beginnt (z.B.
+        eine Funktionsdefinition); deren Ebene ist 0. Ob sie in einem String
+        oder Heredoc liegt, liefert der Zustands-Cache des Highlighters.
+        """
+        highlighter = self.highlighter
+        anchor = 1
+        for number in range(line_number - 1, 0, -1):
+            line = self.get(f"{number}.0", f"{number}.end")
+            if not line or line[0] in " \t" or line.split()[0] in INDENT_MIDDLES:
+                continue
+            if highlighter.line_state(number) == INITIAL_STATE:
+                anchor = number
+                break
+
+        engine = IndentEngine(highlighter.lexer)
+        if anchor < line_number:
+            text_content = self.get(f"{anchor}.0", f"{line_number - 1}.end")
+            for line in text_content.split("\n"):
+                engine.feed(line)
+        return engine
+
+    def _calculate_indent_level(self, line_number, line_content):
+        """Berechnet die Einrückungsebenen einer Zeile und der nächsten Zeile
+
+        Liefert (Ebene der Zeile, Ebene der nächsten Zeile); die erste ist
+        None, wenn die Zeile in einem String oder Heredoc beginnt.
+        """
+        engine = self._indent_engine_at(line_number)
+        line_level = engine.feed(line_content)
+        if engine.state[0] is not None or engine.state[1]:
+            # Die nächste Zeile gehört zu einem String oder Heredoc
+            return line_level, 0
+        return line_level, engine.level
+
+    def replace_lines(self, first_line, last_line, new_lines):
+        """Ersetzt die Zeilen first_line bis last_line durch new_lines
+
+        Die Änderung erfolgt mit einem delete und einem insert, die zusammen
+        einen einzigen Rückgängig-Schritt bilden. Die Hervorhebung ist dabei
+        ausgesetzt und läuft danach einmal über den neuen Bereich. Der Cursor
+        bleibt in seiner Zeile und wandert mit deren Anfang mit.
+        """
+        cursor_line, cursor_col = map(int, self.index(tk.INSERT).split("."))
+        if first_line <= cursor_line <= min(last_line, first_line + len(new_lines) - 1):
+            old_length = len(self.get(f"{cursor_line}.0", f"{cursor_line}.end"))
+            new_length = len(new_lines[cursor_line - first_line])
+            cursor_col = max(cursor_col + new_length - old_length, 0)
+
+        autoseparators = self.text.cget("autoseparators")
+        self.text.configure(autoseparators=False)
+        self.highlighter.suspend()
+        try:
+            self.text.edit_separator()
+            self.delete(f"{first_line}.0", f"{last_line}.end")
+            self.insert(f"{first_line}.0", "\n".join(new_lines))
+            self.text.edit_separator()
+            self.mark_set(tk.INSERT, f"{cursor_line}.{cursor_col}")
+        finally:
+            self.text.configure(autoseparators=autoseparators)
+            self.highlighter.resume()
+
+    def reindent(self):
+        """Rückt die ausgewählten Zeilen bzw. den ganzen Text neu ein
+
+        Die Ebenen aller Zeilen bis zum Ende des Bereichs werden in einem
+        Durchlauf berechnet, die geänderten Zeilen danach in einem Schritt
+        ersetzt.
+        """
+        selection = self._selected_lines()
+        lines = self.get("1.0", "end-1c").split("\n")
+        first_line, last_line = selection or (1, len(lines))
+        new_lines = reindent_lines(
+            lines[:last_line], " " * self.tab_size, self.highlighter.lexer
+        )
+        changed = [
+            number
+            for number in range(first_line, last_line + 1)
+            if new_lines[number - 1] != lines[number - 1]
+        ]
+        if not changed:
+            return
+        start, end = changed[0], changed[-1]
+        self.replace_lines(start, end, new_lines[start - 1 : end])
+        if selection is not None:
+            self._select_lines(first_line, last_line)
 
     def get_current_indent_level(self):
         """Gibt die aktuelle Einrückungsebene zurück"""
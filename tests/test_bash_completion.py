@@ -0,0 +1,341 @@
+"""Tests for the completion indexes of Bash-Script-Maker"""
+
+import sys
+import os
+import json
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bash_completion import (
+    DirectoryCache,
+    ExecutableIndex,
+    FuzzyIndex,
+    OptionIndex,
+    PrefixIndex,
+    SourceIndex,
+    SymbolIndex,
+    edit_distance,
+    fuzzy_score,
+    line_sources,
+    line_symbols,
+    parse_options,
+)
+
+
+def test_prefix_query_returns_sorted_matches():
+    """Test that prefix queries return exactly the matching words in order"""
+    index = PrefixIndex(["grep", "git", "gzip", "awk", "gunzip", "g++"])
+
+    assert index.prefix("g") == ["g++", "git", "grep", "gunzip", "gzip"]
+    assert index.prefix("gu") == ["gunzip"]
+    assert index.prefix("x") == []
+    assert index.prefix("") == ["awk", "g++", "git", "grep", "gunzip", "gzip"]
+
+
+def test_add_and_discard_keep_index_consistent():
+    """Test that single insertions and removals keep the index sorted"""
+    index = PrefixIndex(["echo"])
+    index.add("ed")
+    index.update(["env", "echo"])
+
+    assert len(index) == 3
+    assert "ed" in index
+    assert index.prefix("e") == ["echo", "ed", "env"]
+
+    index.discard("echo")
+    index.discard("missing")
+    assert index.prefix("e") == ["ed", "env"]
+
+
+def test_fuzzy_score_prefers_word_starts_and_runs():
+    """Test that boundary and consecutive matches outrank scattered ones"""
+    assert fuzzy_score("gco", "git-checkout") is not None
+    assert fuzzy_score("xyz", "git-checkout") is None
+    assert fuzzy_score("chk", "chkconfig") > fuzzy_score("chk", "git-checkout")
+    assert fuzzy_score("zip", "zip") > fuzzy_score("zip", "gunzip")
+    assert fuzzy_score("", "ls") == 0
+
+
+def test_edit_distance_counts_transpositions_once():
+    """Test the restricted edit distance and its cutoff"""
+    assert edit_distance("gerp", "grep", 2) == 1
+    assert edit_distance("chmdo", "chmod", 2) == 1
+    assert edit_distance("ls", "ls", 0) == 0
+    assert edit_distance("abc", "xyzuvw", 1) == 2
+
+
+def test_fuzzy_search_ranks_subsequences_and_typos():
+    """Test that fuzzy search finds subsequences and typos, best first"""
+    index = FuzzyIndex(
+        ["grep", "egrep", "git", "gunzip", "unzip", "bunzip2", "chmod", "chown"]
+    )
+
+    assert index.search("nzi") == ["unzip", "gunzip", "bunzip2"]
+    assert index.search("gerp")[0] == "grep"
+    assert index.search("chmdo") == ["chmod"]
+    assert index.search("nzi", limit=1) == ["unzip"]
+    assert index.search("qq") == []
+    assert index.search("") == []
+
+
+def test_fuzzy_index_discard_removes_candidates():
+    """Test that removed words are no longer returned"""
+    index = FuzzyIndex(["grep", "egrep"])
+    index.add("fgrep")
+    index.discard("grep")
+    index.discard("missing")
+
+    assert "grep" not in index
+    assert len(index) == 2
+    assert "grep" not in index.search("grep")
+    assert sorted(index.search("grep")) == ["egrep", "fgrep"]
+
+
+def test_line_symbols_recognizes_definitions():
+    """Test that assignments, declarations, loops and functions are found"""
+    assert line_symbols("x=1 y+=2") == (("x", "y"), ())
+    assert line_symbols("local a b=2") == (("b", "a"), ())
+    assert line_symbols('read -r -p "Name: " name') == (("name",), ())
+    assert line_symbols("for file in *; do") == (("file",), ())
+    assert line_symbols("function greet {") == ((), ("greet",))
+    assert line_symbols("cleanup() { rm -f x; }") == ((), ("cleanup",))
+    assert line_symbols('echo "a=b" # c=1') == ((), ())
+
+
+def test_symbol_index_updates_only_edited_lines():
+    """Test that edits re-read just the marked lines and shift the rest"""
+    text = ["a=1", "f() {", "  local b", "}", "c=3"]
+    read = []
+
+    def read_lines(first_line, last_line):
+        read.append((first_line, last_line))
+        end = len(text) if last_line is None else last_line
+        return text[first_line - 1 : end]
+
+    index = SymbolIndex()
+    index.refresh(read_lines)
+    assert set(index.variables) == {"a", "b", "c"}
+    assert index.functions == {"f": 1}
+
+    # Zeile 3 wird ersetzt und dahinter eine Zeile eingefügt
+    text[2:3] = ["  local d", "e=5"]
+    index.edit(3, 1)
+    read.clear()
+    index.refresh(read_lines)
+    assert read == [(3, 4)]
+    assert set(index.variables) == {"a", "c", "d", "e"}
+    assert index.definition_lines("c") == [6]
+
+    # Zeilen 1 und 2 werden zu einer zusammengefügt
+    text[0:2] = ["a=1 g=7"]
+    index.edit(1, -1)
+    index.refresh(read_lines)
+    assert set(index.variables) == {"a", "c", "d", "e", "g"}
+    assert index.functions == {}
+    assert index.definition_lines("c") == [5]
+
+
+def test_line_sources_resolves_script_directory_idioms():
+    """Test that source targets are found and script-dir prefixes dropped"""
+    assert line_sources("source lib/common.sh") == ("lib/common.sh",)
+    assert line_sources(". ./helpers.sh # Hilfsfunktionen") == ("./helpers.sh",)
+    assert line_sources('x=1; . "$(dirname "$0")/lib/a.sh"') == ("lib/a.sh",)
+    assert line_sources('source "${BASH_SOURCE%/*}/b.sh" arg') == ("b.sh",)
+    assert line_sources("source $HOME/x.sh") == ()
+    assert line_sources("echo . foo") == ()
+
+
+def test_symbol_index_counts_sourced_files():
+    """Test that the symbol index tracks sourced files per line"""
+    text = ["source a.sh", ". b.sh"]
+    index = SymbolIndex()
+    index.refresh(lambda first, last: text[first - 1 : last])
+    assert index.sources == {"a.sh": 1, "b.sh": 1}
+
+    text[1] = "echo"
+    index.edit(2, 0)
+    index.refresh(lambda first, last: text[first - 1 : last])
+    assert index.sources == {"a.sh": 1}
+
+
+def test_source_index_follows_nested_sources_and_cycles(tmp_path):
+    """Test that nested sources resolve per file and cycles terminate"""
+    lib = tmp_path / "lib"
+    lib.mkdir()
+    (lib / "a.sh").write_text("A=1\nsource b.sh\nalpha() { :; }\n")
+    (lib / "b.sh").write_text("export B=2\n. ./a.sh\nbeta() { :; }\n")
+
+    index = SourceIndex()
+    variables, functions = index.symbols(["lib/a.sh", "fehlt.sh"], str(tmp_path))
+
+    assert variables == {"A", "B"}
+    assert functions == {"alpha", "beta"}
+    assert index.parsed_files == 2
+
+
+def test_source_index_rereads_only_changed_files(tmp_path):
+    """Test that unchanged libraries are served from the per-file cache"""
+    library = tmp_path / "lib.sh"
+    library.write_text("old() { :; }\n")
+    index = SourceIndex()
+
+    assert index.symbols(["lib.sh"], str(tmp_path))[1] == {"old"}
+    assert index.symbols(["lib.sh"], str(tmp_path))[1] == {"old"}
+    assert index.parsed_files == 1
+
+    library.write_text("renamed() { :; }\n")
+    stat = library.stat()
+    os.utime(library, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert index.symbols(["lib.sh"], str(tmp_path))[1] == {"renamed"}
+    assert index.parsed_files == 2
+
+
+def _make_executable(directory, name, mode=0o755):
+    path = directory / name
+    path.write_text("#!/bin/sh\n")
+    path.chmod(mode)
+    return path
+
+
+def test_executable_index_rescans_only_changed_directories(tmp_path):
+    """Test that the disk cache is reused for directories with unchanged mtime"""
+    first = tmp_path / "bin"
+    second = tmp_path / "sbin"
+    first.mkdir()
+    second.mkdir()
+    _make_executable(first, "mytool")
+    _make_executable(first, "notes.txt", mode=0o644)
+    _make_executable(second, "admintool")
+    (first / "subdir").mkdir()
+    path = os.pathsep.join([str(first), str(second), str(tmp_path / "missing")])
+    cache_path = tmp_path / "cache" / "path.json"
+
+    index = ExecutableIndex(path=path, cache_path=str(cache_path))
+    assert index.load() == {"mytool", "admintool"}
+    assert index.scanned_directories == 2
+    assert cache_path.exists()
+
+    index = ExecutableIndex(path=path, cache_path=str(cache_path))
+    assert index.load() == {"mytool", "admintool"}
+    assert index.scanned_directories == 0
+
+    _make_executable(second, "newtool")
+    stat = os.stat(second)
+    os.utime(second, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    index = ExecutableIndex(path=path, cache_path=str(cache_path))
+    assert index.load() == {"mytool", "admintool", "newtool"}
+    assert index.scanned_directories == 1
+
+
+def test_executable_index_ignores_invalid_cache(tmp_path):
+    """Test that an unreadable cache falls back to a full scan"""
+    _make_executable(tmp_path, "tool")
+    cache_path = tmp_path / "path.json"
+    cache_path.write_text("{kaputt")
+
+    index = ExecutableIndex(path=str(tmp_path), cache_path=str(cache_path))
+    assert index.load() == {"tool"}
+    assert json.loads(cache_path.read_text())["version"] == index.CACHE_VERSION
+
+
+def test_directory_cache_completes_prefix_with_entry_types(tmp_path):
+    """Test that completion lists matching names and marks directories"""
+    (tmp_path / "script.sh").write_text("")
+    (tmp_path / "scripts").mkdir()
+    (tmp_path / "other").write_text("")
+
+    cache = DirectoryCache()
+    assert cache.complete(str(tmp_path), "scr") == [
+        ("script.sh", False),
+        ("scripts", True),
+    ]
+    assert cache.complete(str(tmp_path), "x") == []
+    assert len(cache.complete(str(tmp_path), "")) == 3
+
+
+def test_directory_cache_reuses_listing_until_ttl_and_mtime_change(tmp_path):
+    """Test that listings are reused within the TTL and while mtime is unchanged"""
+    (tmp_path / "alt").write_text("")
+    directory = str(tmp_path)
+
+    def add_file(name):
+        (tmp_path / name).write_text("")
+        stat = os.stat(directory)
+        os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+    cache = DirectoryCache(ttl=3600)
+    assert cache.listing(directory) == [("alt", False)]
+    add_file("neu")
+    assert cache.listing(directory) == [("alt", False)]
+
+    cache = DirectoryCache(ttl=0)
+    assert cache.listing(directory) == [("alt", False), ("neu", False)]
+    add_file("neuer")
+    assert cache.listing(directory)[-1] == ("neuer", False)
+
+
+def test_directory_cache_reports_batches_and_can_be_cancelled(tmp_path):
+    """Test that scanning reports partial results and stops when cancelled"""
+    import threading
+
+    for number in range(10):
+        (tmp_path / f"datei{number}").write_text("")
+    cache = DirectoryCache(batch_size=4)
+
+    batches = []
+    entries = cache.listing(str(tmp_path), on_batch=batches.append)
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert sorted(entry for batch in batches for entry in batch) == entries
+    assert cache.peek(str(tmp_path)) == entries
+
+    cancelled = threading.Event()
+    cancelled.set()
+    cache.clear()
+    assert cache.listing(str(tmp_path), cancelled) is None
+    assert cache.peek(str(tmp_path)) is None
+
+
+def test_parse_options_reads_help_and_man_layouts():
+    """Test that options are taken from the option column of help lines"""
+    help_text = (
+        "Usage: tool [OPTION]... FILE\n"
+        "  -a, --all                do not ignore -x entries\n"
+        "      --color[=WHEN]       colorize the output\n"
+        "  -\x08--\x08-s\x08si\x08iz\x08ze\x08e=SIZE  overstruck man page\n"
+        "Report bugs to --nobody\n"
+    )
+
+    assert parse_options(help_text) == ["--all", "--color", "--size", "-a"]
+
+
+def test_option_index_caches_by_program_path_and_mtime(tmp_path):
+    """Test that options are extracted once and reused until the binary changes"""
+    calls = tmp_path / "calls"
+    tool = tmp_path / "mytool"
+    tool.write_text(
+        "#!/bin/sh\n"
+        f"echo run >> {calls}\n"
+        "echo '  -q, --quiet    leise'\n"
+        "echo '      --level=N  Stufe'\n"
+    )
+    tool.chmod(0o755)
+    cache_path = str(tmp_path / "options.json")
+
+    index = OptionIndex(cache_path=cache_path, path=str(tmp_path))
+    assert index.options("mytool") is None
+    assert index.request("mytool")
+    assert index.indexed.get(timeout=10) == "mytool"
+    assert index.options("mytool") == ["--level", "--quiet", "-q"]
+    assert not index.request("mytool")
+
+    # Ein neuer Index liest den Cache, ohne das Programm aufzurufen
+    index = OptionIndex(cache_path=cache_path, path=str(tmp_path))
+    assert index.options("mytool") == ["--level", "--quiet", "-q"]
+    assert calls.read_text().count("run") == 1
+
+    stat = os.stat(tool)
+    os.utime(tool, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert index.options("mytool") is None
+    assert index.options("fehlt") is None
+    assert not index.request("fehlt")
@@ -0,0 +1,378 @@
+"""Tests for the Tk-independent Bash lexer of Bash-Script-Maker"""
+
+import io
+import sys
+import os
+import time
+
+import pytest
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bash_lexer import (
+    BashLexer,
+    BlockPairIndex,
+    INITIAL_STATE,
+    indent_levels,
+    pair_events,
+    reindent_lines,
+)
+
+
+def test_tokenize_returns_spans_from_string():
+    """Test that tokenize reports (type, start, end) character offsets"""
+    source = 'echo "$HOME" # Kommentar\nif [ $a -eq 1 ]; then\nfi'
+    lexer = BashLexer()
+    kinds = [(kind, source[start:end]) for kind, start, end in lexer.tokenize(source)]
+
+    assert ("commands", "echo") in kinds
+    assert ("strings", '"$HOME"') in kinds
+    assert ("comments", "# Kommentar") in kinds
+    assert ("variables", "$a") in kinds
+    assert ("operators", "-eq") in kinds
+    assert ("numbers", "1") in kinds
+    assert ("commands", "fi") in kinds
+
+
+def test_tokenize_lines_matches_tokenize_for_file_streams():
+    """Test that streaming over a file object yields the same spans as a string"""
+    source = "cat <<EOF\n$nicht_hervorgehoben\nEOF\necho 'a\nb' done\n"
+    lexer = BashLexer()
+
+    from_string = list(lexer.tokenize(source))
+    from_stream = list(lexer.tokenize_lines(io.StringIO(source)))
+
+    assert from_stream == from_string
+    for kind, start, end in from_stream:
+        assert 0 <= start < end <= len(source)
+
+
+def test_tokenize_lines_is_lazy():
+    """Test that tokenize_lines consumes the line iterator only as needed"""
+    consumed = []
+
+    def lines():
+        for number in range(1000000):
+            consumed.append(number)
+            yield "echo %d\n" % number
+
+    tokens = BashLexer().tokenize_lines(lines())
+    first = next(tokens)
+
+    assert first == ("commands", 0, 4)
+    assert len(consumed) == 1
+
+
+def test_iter_line_tokens_reports_state_per_line():
+    """Test that multi-line constructs carry their state to the next line"""
+    lexer = BashLexer()
+    results = list(lexer.iter_line_tokens(['echo "offen', 'zu"', "ls"]))
+
+    assert [number for number, _, _ in results] == [1, 2, 3]
+    assert results[0][2][0] == '"'
+    assert results[1][1] == [("strings", 0, 3)]
+    assert results[2][2] == INITIAL_STATE
+
+
+def test_custom_command_words():
+    """Test that the set of highlighted command words can be replaced"""
+    lexer = BashLexer(command_words={"mycmd"})
+    kinds = [kind for kind, _, _ in lexer.tokenize("mycmd echo")]
+
+    assert kinds == ["commands"]
+
+
+def test_shift_in_arithmetic_is_not_a_heredoc():
+    """Test that << inside ((...)) and $((...)) does not start a heredoc"""
+    lexer = BashLexer()
+    source = "(( x = 1 << y ))\necho $(( (a) << b ))\necho nach"
+    results = list(lexer.iter_line_tokens(source.split("\n")))
+
+    assert results[0][2] == INITIAL_STATE
+    assert results[1][2] == INITIAL_STATE
+    assert ("commands", 0, 4) in results[2][1]
+    # Hinter der Arithmetik beginnt ein Heredoc wieder wie gewohnt
+    state = lexer.tokenize_line("(( x << 1 )); cat <<EOF", INITIAL_STATE)[1]
+    assert state[1] == (("EOF", False),)
+
+
+def test_path_words_are_commands_only_in_command_position():
+    """Test that programs from $PATH are not highlighted as arguments"""
+    lexer = BashLexer()
+    lexer.path_words.update({"test", "file"})
+    source = "test -f file && file x; if test -n y; then echo test; fi"
+
+    commands = [
+        (source[start:end], start)
+        for kind, start, end in lexer.tokenize(source)
+        if kind == "commands" and source[start:end] in lexer.path_words
+    ]
+    assert commands == [("test", 0), ("file", 16), ("test", 27)]
+
+
+# Pathologische Eingaben, an denen backtrackende Muster quadratisch werden
+ADVERSARIAL_INPUTS = {
+    "unterminated_double_quote": '"' + "a" * 10000,
+    "unterminated_single_quote": "'" + "a" * 10000,
+    "backslash_storm": '"' + "\\" * 10000,
+    "escaped_quote_storm": '"' + '\\"' * 100000,
+    "escaped_quote_continuation": '\\"' * 200000,
+    "quote_backslash_mix": '"\\' * 10000,
+    "many_short_strings": '"a" ' * 10000,
+    "unclosed_braces": "${" * 30000,
+    "heredoc_quote_storm": "<<'" * 10000,
+    "heredoc_whitespace": "<<-" + " \t" * 10000,
+    "unclosed_arithmetic": "((" * 10000 + "a << b",
+    "comment_line": "#" * 100000,
+    "hash_in_words": "a#b $# ${#x} " * 10000,
+    "digits_then_word": "1" * 10000 + "a",
+    "shebang_like": "#!/" + "bas" * 10000,
+    "dollar_storm": "$" * 10000,
+    "huge_single_line": 'echo $HOME "x" && ls -eq 1; ' * 10000,
+}
+
+# Obergrenze je Eingabe; linear sind es wenige Millisekunden
+TIME_BOUND_SECONDS = 1.0
+
+
+@pytest.mark.parametrize("name", sorted(ADVERSARIAL_INPUTS))
+def test_adversarial_input_is_tokenized_in_bounded_time(name):
+    """Test that pathological lines are lexed without regex backtracking blowups"""
+    line = ADVERSARIAL_INPUTS[name]
+    lexer = BashLexer()
+
+    started = time.perf_counter()
+    list(lexer.tokenize(line))
+    assert time.perf_counter() - started < TIME_BOUND_SECONDS
+
+
+@pytest.mark.parametrize("name", sorted(ADVERSARIAL_INPUTS))
+def test_adversarial_continuation_line_in_bounded_time(name):
+    """Test that lines continuing an open string are scanned in bounded time"""
+    line = ADVERSARIAL_INPUTS[name]
+    lexer = BashLexer()
+
+    started = time.perf_counter()
+    lexer.tokenize_line(line, ('"', (), ()))
+    lexer.tokenize_line(line, ("'", (), ()))
+    assert time.perf_counter() - started < TIME_BOUND_SECONDS
+
+
+def test_string_scanning_handles_escapes():
+    """Test that backslashes escape only inside double quotes"""
+    lexer = BashLexer()
+
+    source = 'echo "a\\"b" x'
+    assert ("strings", 5, 11) in list(lexer.tokenize(source))
+
+    source = "echo 'a\\' b"
+    assert ("strings", 5, 9) in list(lexer.tokenize(source))
+
+    tokens, state = lexer.tokenize_line('echo "a\\\\" # Kommentar', INITIAL_STATE)
+    assert tokens[-1] == ("comments", 11, 22)
+    assert state == INITIAL_STATE
+
+
+@pytest.mark.parametrize(
+    "source", ["echo $# x", "echo ${#x} x", "echo a#b x", 'echo "a"#b x']
+)
+def test_hash_inside_a_word_is_not_a_comment(source):
+    """Test that # starts a comment only at the beginning of a word"""
+    kinds = [kind for kind, _, _ in BashLexer().tokenize(source)]
+
+    assert "comments" not in kinds
+
+
+def test_hash_after_separator_starts_a_comment():
+    """Test that # after whitespace or a command separator is a comment"""
+    lexer = BashLexer()
+
+    for source in ("# a", "ls # a", "ls;# a", "(# a"):
+        tokens = list(lexer.tokenize(source))
+        assert tokens[-1] == ("comments", source.index("#"), len(source))
+
+
+def _build_pair_index(source):
+    """Baut einen Paar-Index aus den Tokens eines Quelltexts"""
+    lexer = BashLexer()
+    pairs = BlockPairIndex()
+    lines = source.split("\n")
+    for line_number, tokens, _ in lexer.iter_line_tokens(lines):
+        pairs.set_line(line_number, pair_events(lines[line_number - 1], tokens))
+    return pairs
+
+
+def test_pair_index_matches_brackets_and_blocks():
+    """Test that brackets and block keywords are paired across lines"""
+    source = (
+        "if [ -f x ]; then\n"
+        "    for i in a; do\n"
+        "        echo $(ls (a))\n"
+        "    done\n"
+        "fi"
+    )
+    pairs = _build_pair_index(source)
+
+    assert pairs.find_pair(1, 0) == ((1, 0, 2), (5, 0, 2))
+    assert pairs.find_pair(5, 2) == ((1, 0, 2), (5, 0, 2))
+    assert pairs.find_pair(1, 3) == ((1, 3, 4), (1, 10, 11))
+    assert pairs.find_pair(2, 17) == ((2, 16, 18), (4, 4, 8))
+    assert pairs.find_pair(3, 18) == ((3, 18, 19), (3, 20, 21))
+    assert pairs.find_pair(3, 14) == ((3, 14, 15), (3, 21, 22))
+    assert pairs.find_pair(3, 0) is None
+
+
+def test_pair_index_ignores_case_pattern_parentheses():
+    """Test that the ')' of a case pattern does not break the pairing"""
+    source = "(\ncase $x in\n    a) ls ;;\nesac\n)"
+    pairs = _build_pair_index(source)
+
+    assert pairs.find_pair(2, 0) == ((2, 0, 4), (4, 0, 4))
+    assert pairs.find_pair(1, 0) == ((1, 0, 1), (5, 0, 1))
+
+
+def test_pair_index_ignores_keywords_as_arguments():
+    """Test that block keywords outside command position are not paired"""
+    source = "for i in a; do\n    echo done if\ndone"
+    pairs = _build_pair_index(source)
+
+    assert pairs.find_pair(1, 12) == ((1, 12, 14), (3, 0, 4))
+    assert pairs.find_pair(2, 10) is None
+    assert pairs.find_pair(2, 15) is None
+
+
+def test_pair_index_follows_inserted_lines():
+    """Test that splicing shifts the pairs behind an edit"""
+    pairs = _build_pair_index("{\necho\n}")
+    assert pairs.find_pair(3, 0) == ((1, 0, 1), (3, 0, 1))
+
+    # Zwei neue Zeilen hinter Zeile 2, Zeile 2 wird neu gelext
+    pairs.splice(2, 2)
+    for line_number in (2, 3, 4):
+        pairs.set_line(line_number, ())
+    assert pairs.find_pair(3, 0) is None
+    assert pairs.find_pair(5, 0) == ((1, 0, 1), (5, 0, 1))
+
+
+def test_pair_index_repairs_only_until_the_stack_matches(monkeypatch):
+    """Test that an edit re-pairs from the changed line, not the whole file"""
+    block = "f() {\n    if x; then\n        echo (a)\n    fi\n}\n"
+    pairs = _build_pair_index(block * 2000)
+    assert pairs.find_pair(10000, 0) == ((9996, 4, 5), (10000, 0, 1))
+
+    paired = []
+    pair_line = BlockPairIndex._pair_line
+    monkeypatch.setattr(
+        BlockPairIndex,
+        "_pair_line",
+        staticmethod(lambda line, stack: paired.append(line) or pair_line(line, stack)),
+    )
+    # Zeile 5003 wird bearbeitet, ohne Klammern zu verändern
+    pairs.splice(5003, 0)
+    pairs.set_line(5003, pair_events("echo x", [("commands", 0, 4)]))
+    assert pairs.find_pair(5004, 4) == ((5002, 4, 6), (5004, 4, 6))
+    assert len(paired) == 1
+
+    # Ein neues "if" ohne "fi" ändert alle späteren Paare
+    del paired[:]
+    pairs.splice(5003, 0)
+    pairs.set_line(5003, ((0, 2, "if"),))
+    lines = (block * 2000).split("\n")
+    lines[5002] = "if"
+    expected = _build_pair_index("\n".join(lines))
+    for line_number, col in ((5003, 0), (5004, 4), (5005, 0), (9996, 4), (1, 4)):
+        assert pairs.find_pair(line_number, col) == expected.find_pair(line_number, col)
+    assert len(paired) > 1
+
+
+def test_indent_levels_follow_blocks_not_substrings():
+    """Test that only keywords in command position change the indentation"""
+    lines = [
+        "done_flag=1",
+        "profile=x",
+        "if [ -f x ]; then",
+        "echo fi",
+        "elif true",
+        "then",
+        "for i in 1 2; do",
+        "echo $i",
+        "done",
+        "else",
+        "greet() {",
+        "ls \\",
+        "-l",
+        "}",
+        "fi",
+    ]
+    assert indent_levels(lines) == [0, 0, 0, 1, 0, 0, 1, 2, 1, 0, 1, 2, 3, 1, 0]
+
+
+def test_indent_levels_ignore_hash_inside_words():
+    """Test that $# and a#b do not hide the keywords behind them"""
+    lines = [
+        "if [ $# -lt 1 ]; then echo; fi",
+        "for f in a#b; do",
+        "echo ${#f}",
+        "done",
+        "echo",
+    ]
+    assert indent_levels(lines) == [0, 0, 1, 0, 0]
+
+
+def test_reindent_lines_handles_case_and_leaves_strings_alone():
+    """Test that case branches indent and heredoc/string bodies stay unchanged"""
+    source = (
+        "case $x in\n"
+        "a|b)\n"
+        "echo $(ls)\n"
+        ";;\n"
+        "(c) echo c ;;\n"
+        "esac\n"
+        "cat <<-EOF\n"
+        "\t  bleibt\n"
+        "EOF\n"
+        'x="mehr\n'
+        '  zeilig"\n'
+        "   \n"
+        "arr=(\n"
+        "1\n"
+        ")"
+    )
+    expected = (
+        "case $x in\n"
+        "  a|b)\n"
+        "    echo $(ls)\n"
+        "    ;;\n"
+        "  (c) echo c ;;\n"
+        "esac\n"
+        "cat <<-EOF\n"
+        "\t  bleibt\n"
+        "EOF\n"
+        'x="mehr\n'
+        '  zeilig"\n'
+        "\n"
+        "arr=(\n"
+        "  1\n"
+        ")"
+    )
+    assert "\n".join(reindent_lines(source.split("\n"), indent="  ")) == expected
+
+
+def test_reindent_large_file_in_bounded_time():
+    """Test that a 20k-line script is reindented in one linear pass"""
+    block = ["f() {", "if x; then", "for i in a; do", "echo $i", "done", "fi", "}"]
+    lines = block * 3000
+
+    started = time.perf_counter()
+    result = reindent_lines(lines)
+    assert time.perf_counter() - started < TIME_BOUND_SECONDS
+    assert result[:7] == [
+        "f() {",
+        "    if x; then",
+        "        for i in a; do",
+        "            echo $i",
+        "        done",
+        "    fi",
+        "}",
+    ]
@@ -143,13 +143,9 @@ def test_tab_functionality():
         # Test that tab size is properly set
         assert editor.tab_size == 4
 
-        # Test that indent keywords are defined
-        assert hasattr(editor, 'indent_keywords')
-        assert hasattr(editor, 'dedent_keywords')
-
-        # Test that collections are not empty
-        assert len(editor.indent_keywords) > 0
-        assert len(editor.dedent_keywords) > 0
+        # Test that block keywords drive the indentation of the next line
+        assert editor._calculate_indent_level(1, "if true; then") == (0, 1)
+        assert editor._calculate_indent_level(1, "echo fi") == (0, 0)
     finally:
         root.destroy()
 
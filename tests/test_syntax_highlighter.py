@@ -0,0 +1,878 @@
+"""Tests for the syntax highlighter of Bash-Script-Maker"""
+
+import pytest
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_incremental_highlighting_tracks_edited_lines():
+    """Test that edits only mark the touched lines for re-highlighting"""
+    from syntax_highlighter import BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget)
+        text_widget.insert("1.0", "echo 1\necho 2\necho 3\n")
+        assert highlighter.dirty_lines == (1, 4)
+
+        highlighter.highlight_dirty_lines()
+        assert highlighter.dirty_lines is None
+        assert text_widget.tag_ranges("commands")
+
+        # Eine Änderung in Zeile 2 darf nur Zeile 2 vormerken
+        text_widget.insert("2.0", "ls ")
+        assert highlighter.dirty_lines == (2, 2)
+    finally:
+        root.destroy()
+
+
+def test_single_pass_tokens_do_not_overlap():
+    """Test that the combined lexer tags every character at most once"""
+    from syntax_highlighter import BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget)
+        source = 'echo "kein # Kommentar 42" # Kommentar\nif [ $a -eq 1 ]; then ls; fi\n'
+        tokens = list(highlighter.tokenize(source))
+
+        # Tokens sind sortiert und überlappen sich nicht
+        for (_, _, previous_end), (_, start, _) in zip(tokens, tokens[1:]):
+            assert previous_end <= start
+
+        kinds = [(tag, source[start:end]) for tag, start, end in tokens]
+        assert ("strings", '"kein # Kommentar 42"') in kinds
+        assert ("comments", "# Kommentar") in kinds
+        assert ("operators", "-eq") in kinds
+        assert ("commands", "then") in kinds
+        # Nicht hervorgehobene Wörter erzeugen keine Tokens
+        assert all(text != "a" for _, text in kinds)
+    finally:
+        root.destroy()
+
+
+def test_lazy_highlighting_completes_in_background():
+    """Test that only the viewport is highlighted at once, the rest later"""
+    from syntax_highlighter import BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget)
+        text_widget.insert("1.0", "echo x\n" * 2000)
+        highlighter.highlight_syntax()
+
+        # Außerhalb des sichtbaren Bereichs steht die Hervorhebung noch aus
+        assert text_widget.tag_nextrange(highlighter.PENDING_TAG, "1.0")
+
+        while text_widget.tag_nextrange(highlighter.PENDING_TAG, "1.0"):
+            highlighter._highlight_background_step()
+        assert len(text_widget.tag_ranges("commands")) == 2 * 2000
+    finally:
+        root.destroy()
+
+
+def test_highlight_scheduler_skips_unchanged_buffer():
+    """Test that bursts of edits are coalesced and no-op passes are skipped"""
+    from syntax_highlighter import BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget)
+        for char in "echo":
+            text_widget.insert(tk.END, char)
+        assert highlighter.revision == 4
+        assert highlighter._highlight_job is not None
+
+        highlighter._run_scheduled_highlight()
+        assert highlighter._highlight_job is None
+
+        # Ohne Änderung (z.B. nach einem Mausklick) wird nichts geplant
+        highlighter.schedule_highlight()
+        assert highlighter._highlight_job is None
+    finally:
+        root.destroy()
+
+
+def test_stateful_lexer_handles_multiline_constructs():
+    """Test heredocs, multi-line strings and case patterns"""
+    from syntax_highlighter import BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget)
+        source = (
+            "cat <<EOF\n"
+            "echo $HOME\n"
+            "EOF\n"
+            'echo "eins\n'
+            '# zwei" ls\n'
+            "case $1 in\n"
+            "  rm) echo x ;;\n"
+            "esac\n"
+        )
+        kinds = [(tag, source[start:end]) for tag, start, end in highlighter.tokenize(source)]
+        assert ("strings", "echo $HOME") in kinds
+        assert ("strings", '"eins') in kinds
+        assert ("strings", '# zwei"') in kinds
+        assert ("commands", "ls") in kinds
+        assert ("commands", "rm") not in kinds
+        assert ("commands", "esac") in kinds
+
+        # Ein neu geöffneter String färbt die Folgezeilen neu, bis der Zustand passt
+        text_widget.insert("1.0", "echo 1\necho 2\necho 3\n")
+        highlighter.highlight_lines(1, 4)
+        text_widget.insert("1.0", '"')
+        highlighter.highlight_lines(1, 1)
+        while text_widget.tag_nextrange(highlighter.PENDING_TAG, "1.0"):
+            highlighter._highlight_background_step()
+        assert highlighter.line_states[2][0] == '"'
+        assert text_widget.tag_nextrange("strings", "3.0", "3.end")
+    finally:
+        root.destroy()
+
+
+def test_tag_changes_are_applied_as_delta():
+    """Test that only changed tokens of a line are re-tagged"""
+    from syntax_highlighter import BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget)
+        text_widget.insert("1.0", "echo 1\nls 2\n")
+        highlighter.highlight_lines(1, 3)
+        assert highlighter.line_tokens[1] == (("commands", 0, 2), ("numbers", 3, 4))
+
+        # Die geänderte Zeile gilt als unbekannt und wird vollständig neu gesetzt
+        text_widget.insert("2.0", "# ")
+        assert highlighter.line_tokens[1] is None
+        highlighter.highlight_lines(2, 2)
+        assert highlighter.line_tokens[1] == (("comments", 0, 6),)
+        assert len(text_widget.tag_ranges("commands")) == 2
+        assert not text_widget.tag_nextrange("numbers", "2.0", "2.end")
+    finally:
+        root.destroy()
+
+
+def test_worker_thread_highlights_large_buffer():
+    """Test that large buffers are tokenized on a worker thread"""
+    from syntax_highlighter import BashSyntaxHighlighter
+    import tkinter as tk
+    import time
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget, thread_min_lines=50)
+        text_widget.insert("1.0", "echo $i\n" * 500)
+        highlighter.highlight_syntax()
+        assert highlighter._worker_generation == highlighter._generation
+
+        deadline = time.time() + 10
+        while text_widget.tag_ranges(highlighter.PENDING_TAG):
+            assert time.time() < deadline
+            root.update()
+        assert text_widget.tag_nextrange("commands", "500.0", "500.end")
+        assert text_widget.tag_nextrange("variables", "500.0", "500.end")
+    finally:
+        root.destroy()
+
+
+def test_stale_worker_results_are_discarded():
+    """Test that results of an older generation are not applied"""
+    from syntax_highlighter import BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget, threaded=False)
+        text_widget.insert("1.0", "echo\n")
+        state = highlighter.INITIAL_STATE
+
+        # Der Worker lext einen Schnappschuss, danach ändert sich der Text
+        highlighter._tokenize_worker(highlighter._generation, 1, "echo", state)
+        text_widget.insert("2.0", "x")
+        highlighter._drain_worker_results()
+        assert not text_widget.tag_ranges("commands")
+
+        # Ergebnisse der aktuellen Generation werden übernommen
+        highlighter._tokenize_worker(highlighter._generation, 1, "echo", state)
+        highlighter._drain_worker_results()
+        assert text_widget.tag_ranges("commands")
+    finally:
+        root.destroy()
+
+
+def test_viewport_only_mode_skips_background_highlighting():
+    """Test that large-file mode leaves off-screen lines pending"""
+    from syntax_highlighter import BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root, height=10)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget)
+        highlighter.set_viewport_only(True)
+        text_widget.insert("1.0", "echo 1\n" * 1000)
+        highlighter.highlight_syntax()
+        root.update()
+
+        assert text_widget.tag_nextrange("commands", "1.0", "2.0")
+        assert not text_widget.tag_nextrange("commands", "900.0", "901.0")
+
+        # Zurück zur vollen Hervorhebung
+        highlighter.set_viewport_only(False)
+        assert highlighter._background_job is not None
+    finally:
+        root.destroy()
+
+
+def test_added_command_words_in_viewport_only_mode_skip_the_buffer_scan():
+    """Test that large-file mode colors new commands only where visible"""
+    from syntax_highlighter import BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root, height=10)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget)
+        highlighter.set_viewport_only(True)
+        text_widget.insert("1.0", "mytool\n" * 1000)
+        highlighter.highlight_syntax()
+        root.update()
+
+        reads = []
+        get = text_widget.get
+        text_widget.get = lambda *args: reads.append(args) or get(*args)
+        highlighter.add_command_words({"mytool"})
+        assert ("1.0", "end-1c") not in reads
+
+        assert text_widget.tag_nextrange("commands", "1.0", "2.0")
+        assert not text_widget.tag_nextrange("commands", "900.0", "901.0")
+        assert text_widget.tag_nextrange(highlighter.PENDING_TAG, "900.0", "901.0")
+    finally:
+        root.destroy()
+
+
+def test_tags_share_named_fonts():
+    """Test that a font change is picked up by all tags without re-tagging"""
+    from syntax_highlighter import BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget)
+        bold_font = highlighter.fonts["bold"]
+        assert text_widget.tag_cget("commands", "font") == str(bold_font)
+        assert text_widget.tag_cget("strings", "font") == str(bold_font)
+        assert text_widget.tag_cget("comments", "font") == str(
+            highlighter.fonts["italic"]
+        )
+
+        bold_font.configure(size=16)
+        assert text_widget.tag_cget("commands", "font") == str(bold_font)
+        assert bold_font.cget("size") == 16
+    finally:
+        root.destroy()
+
+
+def test_matching_pair_is_highlighted_at_cursor():
+    """Test that the pair under the cursor gets the pair tag"""
+    from syntax_highlighter import BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget)
+        text_widget.insert("1.0", "if true; then\n    echo (a)\nfi\n")
+        highlighter.highlight_lines(1, 4)
+
+        text_widget.mark_set(tk.INSERT, "3.0")
+        highlighter.highlight_matching_pair()
+        ranges = [str(index) for index in text_widget.tag_ranges("pair_match")]
+        assert ranges == ["1.0", "1.2", "3.0", "3.2"]
+
+        text_widget.mark_set(tk.INSERT, "2.9")
+        highlighter.highlight_matching_pair()
+        ranges = [str(index) for index in text_widget.tag_ranges("pair_match")]
+        assert ranges == ["2.9", "2.10", "2.11", "2.12"]
+    finally:
+        root.destroy()
+
+
+def test_autocomplete_prefix_suggestions_are_sorted():
+    """Test that command suggestions come from the prefix index"""
+    from syntax_highlighter import BashAutocomplete
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        autocomplete = BashAutocomplete(text_widget)
+        suggestions = autocomplete.get_context_aware_suggestions("ch", "ch", "1.2")
+        assert suggestions == ["chmod", "chown"]
+
+        # Ohne Präfix-Treffer werden unscharfe Treffer nach Bewertung geliefert
+        suggestions = autocomplete.get_context_aware_suggestions("nzi", "nzi", "1.3")
+        assert suggestions == ["unzip", "gunzip", "bunzip2"]
+        suggestions = autocomplete.get_context_aware_suggestions("gerp", "gerp", "1.4")
+        assert suggestions[0] == "grep"
+    finally:
+        root.destroy()
+
+
+def test_autocomplete_symbols_follow_edits():
+    """Test that variable and function suggestions track edits incrementally"""
+    from syntax_highlighter import BashAutocomplete, BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget)
+        autocomplete = BashAutocomplete(text_widget)
+        autocomplete.track_edits(highlighter)
+        text_widget.insert("1.0", "alt=1\ngreet() {\n    local name\n}\n")
+        assert "$alt" in autocomplete.get_variable_suggestions()
+        assert "$name" in autocomplete.get_variable_suggestions()
+        assert autocomplete.get_variable_suggestions("$na") == ["$name"]
+
+        # Variablen werden wie Befehle per Präfix gefiltert und eingegrenzt
+        suggestions, _ = autocomplete.query_suggestions("$a", "$a", "1.2")
+        assert suggestions == ["$alt"]
+        assert autocomplete.narrow_suggestions("$al") == ["$alt"]
+        assert autocomplete.get_context_aware_suggestions("gree", "gree", "1.4") == [
+            "greet"
+        ]
+
+        text_widget.delete("1.0", "2.0")
+        text_widget.insert("end", "read -r neu\n")
+        variables = autocomplete.get_variable_suggestions()
+        assert "$alt" not in variables
+        assert "$neu" in variables
+        assert autocomplete.symbols.definition_lines("greet") == [1]
+    finally:
+        root.destroy()
+
+
+def test_insert_at_end_reports_the_last_line():
+    """Test that insert("end", ...) marks the line it actually edits"""
+    from syntax_highlighter import BashAutocomplete, BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget)
+        autocomplete = BashAutocomplete(text_widget)
+        autocomplete.track_edits(highlighter)
+        text_widget.insert("1.0", "a=1\n")
+        highlighter.highlight_syntax()
+        assert "$a" in autocomplete.get_variable_suggestions()
+
+        text_widget.insert("end", "b=2\n")
+        assert highlighter.dirty_lines[0] == 2
+        assert "$b" in autocomplete.get_variable_suggestions()
+    finally:
+        root.destroy()
+
+
+def test_autocomplete_offers_symbols_from_sourced_files(tmp_path):
+    """Test that functions and variables of sourced scripts are suggested"""
+    from syntax_highlighter import BashAutocomplete
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        (tmp_path / "common.sh").write_text("export LOG_DIR=/tmp\nlog_info() { :; }\n")
+        autocomplete = BashAutocomplete(text_widget)
+        autocomplete.script_path = str(tmp_path / "main.sh")
+        text_widget.insert("1.0", 'source "$(dirname "$0")/common.sh"\n')
+
+        assert "$LOG_DIR" in autocomplete.get_variable_suggestions()
+        assert autocomplete.get_function_suggestions("log_") == {"log_info"}
+    finally:
+        root.destroy()
+
+
+def test_added_command_words_are_highlighted():
+    """Test that commands found in $PATH are highlighted after loading"""
+    from syntax_highlighter import BashAutocomplete, BashSyntaxHighlighter
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        highlighter = BashSyntaxHighlighter(text_widget)
+        autocomplete = BashAutocomplete(text_widget)
+        text_widget.insert("1.0", "mytool --help\nx=mytool\n")
+        highlighter.highlight_syntax()
+        assert not text_widget.tag_ranges("commands")
+        states = list(highlighter.line_states)
+
+        autocomplete.add_commands({"mytool"})
+        highlighter.add_command_words({"mytool"})
+        ranges = [str(index) for index in text_widget.tag_ranges("commands")]
+        assert ranges == ["1.0", "1.6"]
+        # Die Zeilenzustände bleiben gültig und werden nicht verworfen
+        assert highlighter.line_states[: len(states)] == states
+        assert autocomplete.get_context_aware_suggestions("myt", "myt", "1.3") == [
+            "mytool"
+        ]
+    finally:
+        root.destroy()
+
+
+def test_path_listing_runs_in_background_and_can_be_cancelled(tmp_path):
+    """Test that uncached directories are listed asynchronously behind a loading row"""
+    from syntax_highlighter import BashAutocomplete
+    import tkinter as tk
+    import time
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        for number in range(50):
+            (tmp_path / f"datei{number:02d}").write_text("")
+        (tmp_path / "ordner").mkdir()
+        autocomplete = BashAutocomplete(text_widget)
+        autocomplete.directory_cache.batch_size = 10
+        partial = f"{tmp_path}/d"
+        text_widget.insert("1.0", partial)
+
+        autocomplete.show_suggestions()
+        listbox = autocomplete.suggestions_listbox
+        assert listbox.get(tk.END) == autocomplete.loading_text
+
+        deadline = time.monotonic() + 5
+        while autocomplete._path_listing is not None and time.monotonic() < deadline:
+            root.update()
+        assert autocomplete.current_suggestions[0] == f"{tmp_path}/datei00"
+        assert len(autocomplete.current_suggestions) == 50
+        assert listbox.get(0) == f"{tmp_path}/datei00"
+
+        # Escape bricht ein laufendes Einlesen ab
+        autocomplete.directory_cache.clear()
+        autocomplete.show_suggestions()
+        listing = autocomplete._path_listing
+        autocomplete.hide_suggestions()
+        assert listing.is_set()
+        assert not autocomplete.popup_visible
+    finally:
+        root.destroy()
+
+
+def test_as_you_type_narrows_previous_results():
+    """Test that typing more of the same word filters instead of re-querying"""
+    from syntax_highlighter import BashAutocomplete
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        autocomplete = BashAutocomplete(text_widget)
+        autocomplete.set_as_you_type(True)
+        text_widget.insert("1.0", "gr")
+        autocomplete.update_suggestions()
+        first = list(autocomplete.current_suggestions)
+        assert "grep" in first
+        assert autocomplete.popup_visible
+
+        queries = []
+        query = autocomplete.get_context_aware_suggestions
+
+        def counting_query(*args):
+            queries.append(args)
+            return query(*args)
+
+        autocomplete.get_context_aware_suggestions = counting_query
+        text_widget.insert(tk.INSERT, "e")
+        autocomplete.update_suggestions()
+        assert queries == []
+        assert autocomplete.current_suggestions == [
+            word for word in first if word.startswith("gre")
+        ]
+
+        # Ein neues Verzeichnis lässt sich nicht eingrenzen
+        autocomplete._query_word = "/usr/b"
+        autocomplete._query_results = ["/usr/bin/"]
+        assert autocomplete.narrow_suggestions("/usr/bi") == ["/usr/bin/"]
+        assert autocomplete.narrow_suggestions("/usr/bin/") is None
+        assert autocomplete.narrow_suggestions("/usr/x") is None
+
+        autocomplete.set_as_you_type(False)
+        assert not autocomplete.popup_visible
+    finally:
+        root.destroy()
+
+
+def test_loaded_options_do_not_reopen_dismissed_popup():
+    """Test that options indexed in the background only refresh a visible list"""
+    from syntax_highlighter import BashAutocomplete
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        autocomplete = BashAutocomplete(text_widget)
+        text_widget.insert("1.0", "grep --")
+        autocomplete._option_word = "--"
+        autocomplete.hide_suggestions()
+        assert autocomplete._option_word is None
+
+        # Optionen treffen erst nach dem Schließen der Liste ein
+        autocomplete._option_word = "--"
+        autocomplete.option_index.indexed.put("grep")
+        autocomplete._poll_option_index()
+        assert not autocomplete.popup_visible
+        assert autocomplete._option_word is None
+    finally:
+        root.destroy()
+
+
+def test_narrowing_is_bound_to_the_queried_word():
+    """Test that results for one word are not narrowed for a word elsewhere"""
+    from syntax_highlighter import BashAutocomplete
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        autocomplete = BashAutocomplete(text_widget)
+        text_widget.insert("1.0", "ls -l\ngrep -l")
+        text_widget.mark_set(tk.INSERT, "1.5")
+        suggestions, _ = autocomplete.query_suggestions("-l", "ls -l", "1.5")
+        assert "-la" in suggestions
+        assert autocomplete.narrow_suggestions("-l") == suggestions
+
+        # Dasselbe Wort hinter grep gehört zu einer anderen Abfrage
+        text_widget.mark_set(tk.INSERT, "2.7")
+        assert autocomplete.narrow_suggestions("-l") is None
+
+        # Schließen der Liste verwirft die Abfrage ebenfalls
+        text_widget.mark_set(tk.INSERT, "1.5")
+        autocomplete.query_suggestions("-l", "ls -l", "1.5")
+        autocomplete.hide_suggestions()
+        assert autocomplete.narrow_suggestions("-l") is None
+    finally:
+        root.destroy()
+
+
+def test_suggestion_popup_is_reused_and_renders_one_page():
+    """Test that the popup survives hiding and shows only the visible page"""
+    from syntax_highlighter import BashAutocomplete
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+        text_widget = tk.Text(root)
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        autocomplete = BashAutocomplete(text_widget)
+        suggestions = [f"befehl{number:04d}" for number in range(5000)]
+        text_widget.insert("1.0", "befehl")
+        autocomplete.current_word_start = "1.0"
+        autocomplete.current_word_end = "1.6"
+
+        autocomplete.open_suggestions_window(suggestions)
+        window = autocomplete.suggestions_window
+        listbox = autocomplete.suggestions_listbox
+        assert listbox.size() == autocomplete.page_size
+
+        # Blättern rendert die Seite neu, die Auswahl folgt
+        autocomplete.navigate_suggestions(25)
+        assert listbox.get(0) == "befehl0016"
+        assert listbox.get(listbox.curselection()[0]) == "befehl0025"
+        autocomplete.scroll_suggestions(1000)
+        assert listbox.get(0) == "befehl1016"
+
+        autocomplete.apply_suggestion()
+        assert text_widget.get("1.0", "end-1c") == "befehl0025"
+        assert not autocomplete.popup_visible
+
+        autocomplete.open_suggestions_window(suggestions[:3])
+        assert autocomplete.suggestions_window is window
+        assert listbox.size() == 3
+    finally:
+        root.destroy()
+
+
+def test_editor_reindent_is_a_single_undo_step():
+    """Test that reindenting replaces the lines in one undoable edit"""
+    from syntax_highlighter import BashScriptEditor
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        editor = BashScriptEditor(root, undo=True)
+        source = "if x; then\necho done_flag\nfi\nprofile=1"
+        editor.insert("1.0", source)
+        editor.reindent()
+        assert editor.get("1.0", "end-1c") == (
+            "if x; then\n    echo done_flag\nfi\nprofile=1"
+        )
+        editor.text.edit_undo()
+        assert editor.get("1.0", "end-1c") == source
+
+        # Enter rückt hinter dem Block-Ende aus und korrigiert die Zeile selbst
+        editor.delete("1.0", "end")
+        editor.insert("1.0", "for i in a; do\n    echo $i\n    done")
+        editor.mark_set("insert", "end-1c")
+        editor.handle_return(None)
+        assert editor.get("1.0", "end-1c") == "for i in a; do\n    echo $i\ndone\n"
+    finally:
+        root.destroy()
+
+
+def test_block_edits_are_single_undo_steps():
+    """Test that indent, comment and duplicate replace the lines in one edit"""
+    from syntax_highlighter import BashScriptEditor
+    import tkinter as tk
+    import time
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        editor = BashScriptEditor(root, undo=True)
+        source = "\n".join(f"echo {number}" for number in range(10000))
+        editor.insert("1.0", source)
+        highlight_runs = []
+        highlight_dirty_lines = editor.highlighter.highlight_dirty_lines
+        editor.highlighter.highlight_dirty_lines = lambda: (
+            highlight_runs.append(editor.highlighter.dirty_lines),
+            highlight_dirty_lines(),
+        )
+
+        editor.tag_add(tk.SEL, "1.0", "end")
+        started = time.perf_counter()
+        editor.insert_indent()
+        assert time.perf_counter() - started < 1.0
+        assert editor.get("10000.0", "10000.end") == "    echo 9999"
+        assert len(highlight_runs) == 1
+        editor.text.edit_undo()
+        assert editor.get("1.0", "end-1c") == source
+
+        editor.delete("1.0", "end")
+        editor.insert("1.0", "a\nb\nc")
+        editor.tag_add(tk.SEL, "2.0", "3.end")
+        editor.comment_uncomment_selection()
+        assert editor.get("1.0", "end-1c") == "a\n# b\n# c"
+        editor.duplicate_line()
+        assert editor.get("1.0", "end-1c") == "a\n# b\n# c\n# b\n# c"
+        editor.text.edit_undo()
+        assert editor.get("1.0", "end-1c") == "a\n# b\n# c"
+    finally:
+        root.destroy()
+
+
+def test_line_number_gutter_draws_only_visible_lines():
+    """Test that the gutter numbers the visible lines and follows scrolling"""
+    from syntax_highlighter import BashScriptEditor
+    import tkinter as tk
+
+    # Skip if tkinter is not available or no display
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("No display available for tkinter tests")
+        return
+
+    try:
+        editor = BashScriptEditor(root, height=20, wrap=tk.NONE)
+        editor.pack()
+        editor.insert("1.0", "\n".join(f"echo {number}" for number in range(5000)))
+        root.update()
+
+        gutter = editor.gutter
+        numbers = [gutter.itemcget(item, "text") for item in gutter.find_all()]
+        assert numbers[0] == "1"
+        assert len(numbers) <= 21
+        assert sorted(gutter.line_positions) == list(range(1, len(numbers) + 1))
+
+        editor.text.yview("2000.0")
+        root.update()
+        numbers = [gutter.itemcget(item, "text") for item in gutter.find_all()]
+        assert numbers[0] == "2000"
+        assert len(numbers) <= 21
+
+        # Tippen auf einer sichtbaren Zeile (insert + see) zeichnet nicht neu
+        redraws = []
+        redraw = gutter.redraw
+        gutter.redraw = lambda: redraws.append(1) or redraw()
+        for char in "abc":
+            editor.text.insert("2005.0", char)
+            editor.text.mark_set(tk.INSERT, "2005.1")
+            editor.text.see(tk.INSERT)
+            root.update()
+        assert redraws == []
+        gutter.redraw = redraw
+
+        # Eine Änderung ohne neue Zeile plant nur eine Prüfung; Scrollen
+        # wertet denselben Job zum vollständigen Neuzeichnen auf
+        editor.text.configure(wrap=tk.WORD)
+        editor.text.insert("2001.0", "x")
+        editor.text.yview("3000.0")
+        root.update()
+        numbers = [gutter.itemcget(item, "text") for item in gutter.find_all()]
+        assert numbers[0] == "3000"
+    finally:
+        root.destroy()